@@ -1,40 +1,116 @@
+import heapq
 from math import dist
-from mesa import Agent
+
+import numpy as np
+
+from agents.allocation import hungarian
+from agents.compact import CompactAgent
+from agents.cooperative import CooperativeAgent
+from agents.goal_based import GoalBasedAgent
+from agents.state_based import StateBasedAgent
 from environment.resource import ResourceType
+from instrumentation.events import DEBUG, INFO
 
 VALUE = {
     ResourceType.CRYSTAL: 10,
     ResourceType.METAL: 20,
     ResourceType.STRUCTURE: 50,
 }
-DEBUG_BDI = True
+TEAMS = {
+    "GOAL": GoalBasedAgent,
+    "STATE": StateBasedAgent,
+    "COOPERATIVE": CooperativeAgent,
+}
+
 
+def log(agent, msg: str, *args, level: int = INFO) -> None:
+    events = agent.model.events
+    if level >= events.level:
+        events.emit(level, "BDI", agent.unique_id, agent.model.schedule.time, msg, args)
 
-def log(agent, msg: str) -> None:
-    if not DEBUG_BDI:
-        return
-    step = agent.model.schedule.time
-    print(f"[BDI {agent.unique_id:02} | t={step:03}] {msg}")
 
+class BDIAgent(CompactAgent):
+    __slots__ = (
+        "name",
+        "bus",
+        "beliefs",
+        "dispatched_GOAL",
+        "dispatched_STATE",
+        "assignments",
+        "queues",
+        "_dispatched_structures",
+    )
 
-class BDIAgent(Agent):
     def __init__(self, uid, model, bus):
         super().__init__(uid, model)
         self.bus = bus
-        self.beliefs: dict[tuple[int, int], ResourceType] = {}
+        # crenças são o conhecimento compartilhado do modelo, lido sem cópia
+        self.beliefs = model.known_resources
         self.dispatched_GOAL: set[tuple[int, int]] = set()
         self.dispatched_STATE: set[tuple[int, int]] = set()
+        # última tarefa enviada a cada agente: (posição, passo do envio)
+        self.assignments: dict[int, tuple[tuple[int, int], int]] = {}
+        # por time, heap de (-valor, distância à base, posição) das crenças
+        # ainda não despachadas; entradas obsoletas são descartadas ao sair
+        self.queues: dict[str, list] = {team: [] for team in TEAMS}
+        self._dispatched_structures = {"GOAL": set(), "STATE": set()}
         self.bus.register("BDI")
+        for pos, rt in self.beliefs.items():
+            self._enqueue(pos, rt)
+        self.beliefs.listeners.append(self._on_resource)
 
     def step(self):
-        self._merge_model_beliefs()
         self._receive_beliefs()
+        every = self.model.allocation_interval
+        if every:
+            if self.model.schedule.time % every == 0:
+                for team in TEAMS:
+                    self._allocate(team)
+            return
         self._delegate("GOAL")
         self._delegate("STATE")
         self._delegate("COOPERATIVE")
 
-    def _merge_model_beliefs(self):
-        self.beliefs.update(self.model.known_resources)
+    def _on_resource(self, pos, rt):
+        if rt is not None:
+            self._enqueue(pos, rt)
+        else:
+            self._forget(pos)
+
+    def _enqueue(self, pos, rt):
+        entry = (-VALUE[rt], dist(self.model.base_position, pos), pos)
+        for heap in self.queues.values():
+            heapq.heappush(heap, entry)
+
+    def _forget(self, pos):
+        for team, structures in self._dispatched_structures.items():
+            self._dispatched(team).discard(pos)
+            structures.discard(pos)
+        # compacta os heaps quando as entradas obsoletas dominam
+        for heap in self.queues.values():
+            if len(heap) > 2 * len(self.beliefs) + 64:
+                heap[:] = [e for e in heap if self.beliefs.get(e[2]) is not None]
+                heapq.heapify(heap)
+
+    def _dispatched(self, team: str) -> set:
+        return self.dispatched_GOAL if team == "GOAL" else self.dispatched_STATE
+
+    def _pop_pending(self, team: str):
+        """Retira do heap a crença pendente de maior prioridade do time."""
+        heap = self.queues[team]
+        disp = self._dispatched(team)
+        while heap:
+            entry = heapq.heappop(heap)
+            pos = entry[2]
+            rt = self.beliefs.get(pos)
+            # descarta posições consumidas, já despachadas, cujo tipo mudou ou
+            # sem caminho até a base
+            if rt is None or pos in disp or -VALUE[rt] != entry[0]:
+                continue
+            if not self.model.reachable(pos):
+                continue
+            return entry
+        return None
 
     def _receive_beliefs(self):
         for msg in self.bus.receive("BDI"):
@@ -42,21 +118,135 @@ class BDIAgent(Agent):
                 continue
             pos = tuple(msg["data"]["position"])
             rt = ResourceType[msg["data"]["resource_type"]]
-            self.beliefs[pos] = rt
-            self.model.report_resource(pos, rt)
-            log(self, f"nova crença: {rt.name} em {pos}")
+            if self.model.report_resource(pos, rt):
+                log(self, "nova crença: %s em %s", rt.name, pos, level=DEBUG)
 
-    def _delegate(self, team: str):
-        disp = self.dispatched_GOAL if team == "GOAL" else self.dispatched_STATE
-        pending = {p: rt for p, rt in self.beliefs.items() if p not in disp}
-        if not pending or any(self.beliefs[p] == ResourceType.STRUCTURE for p in disp):
+    def _allocate(self, team: str):
+        """Distribui recursos pendentes a todos os agentes ociosos do time de uma vez.
+
+        Monta uma matriz agentes × vagas com o custo ``(d(agente, recurso) +
+        d(recurso, base) + 1) / valor``, com distâncias a pé contornando
+        obstáculos, e resolve a atribuição com o algoritmo húngaro. Recursos
+        sem caminho até a base não entram. STRUCTURE oferece duas vagas (menos as já ocupadas) quando é
+        possível formar a dupla. Só as ``4 × ociosos`` crenças de maior
+        prioridade saem do heap do time. Cada agente recebe a tarefa
+        diretamente na própria caixa de entrada.
+
+        Com o mundo dividido entre processos, ``model.remote_agents`` traz os
+        resumos dos agentes dos outros shards (com um passo de atraso); as
+        tarefas deles seguem pelo roteador como qualquer mensagem direta.
+        """
+        cls = TEAMS[team]
+        members = [a for a in self.model.schedule.agents if isinstance(a, cls)]
+        members += [a for a in self.model.remote_agents if issubclass(a.cls, cls)]
+        now = self.model.schedule.time
+        reachable = self.model.reachable
+        idle, holders = [], {}
+        for a in members:
+            if a.carrying or not reachable(a.pos):
+                continue
+            if a.waiting_for_help:
+                holders[a.pos] = holders.get(a.pos, 0) + 1
+                continue
+            task = getattr(a, "current_task", None)
+            tpos = tuple(task["position"]) if task else None
+            if tpos is None or tpos not in self.beliefs:
+                # tarefa enviada que o agente ainda não leu: ele a lê no passo
+                # seguinte e, entre shards, o resumo mostra a leitura dois
+                # passos depois do envio; depois disso, sem tarefa, está livre
+                sent = self.assignments.get(a.unique_id)
+                tpos = sent[0] if sent and now - sent[1] < 2 else None
+            if tpos is not None and tpos in self.beliefs:
+                holders[tpos] = holders.get(tpos, 0) + 1
+            else:
+                idle.append(a)
+        if not idle:
             return
-        best_pos, best_rt = min(
-            pending.items(),
-            key=lambda kv: (-VALUE[kv[1]], dist(self.model.base_position, kv[0])),
+
+        # cooperativos completam a dupla de qualquer agente esperando
+        pairable = (
+            len(members) >= 2
+            or any(isinstance(a, CooperativeAgent) for a in self.model.schedule.agents)
+            or any(
+                issubclass(a.cls, CooperativeAgent) for a in self.model.remote_agents
+            )
         )
-        self.bus.send(
-            f"broadcast_{team}",
+        # limita a matriz às vagas mais promissoras (valor, distância à base)
+        limit = max(4 * len(idle), 32)
+        slots, taken = [], []
+        while len(slots) < limit:
+            entry = self._pop_pending(team)
+            if entry is None:
+                break
+            taken.append(entry)
+            p = entry[2]
+            rt = self.beliefs[p]
+            if rt == ResourceType.STRUCTURE:
+                free = 2 - holders.get(p, 0) if pairable else 0
+            else:
+                free = 1 - holders.get(p, 0)
+            slots.extend([(p, rt)] * max(free, 0))
+        heap = self.queues[team]
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        slots = slots[:limit]
+        if not slots:
+            return
+
+        sxs = np.array([p[0] for p, _ in slots])
+        sys_ = np.array([p[1] for p, _ in slots])
+        back = self.model.home.distances(sxs, sys_)[None, :]
+        value = np.array([VALUE[rt] for _, rt in slots])[None, :]
+        cost = (self._travel(idle, slots) + back + 1) / value
+
+        for i, j in hungarian(cost):
+            agent, (p, rt) = idle[i], slots[j]
+            self.bus.send(
+                str(agent.unique_id),
+                {
+                    "type": "task",
+                    "action": "collect",
+                    "position": p,
+                    "resource_type": rt.name,
+                },
+            )
+            self.assignments[agent.unique_id] = (p, now)
+            log(self, "atribuiu %s em %s a %s", rt.name, p, agent.name)
+
+    def _travel(self, agents, slots) -> np.ndarray:
+        """Distância a pé de cada agente a cada vaga: agentes × vagas.
+
+        Sem obstáculos é a distância de Manhattan; com obstáculos, um BFS por
+        agente que para ao alcançar todas as vagas. Todos estão na componente
+        da base, então todas as vagas são alcançadas.
+        """
+        pxs = np.array([a.pos[0] for a in agents])[:, None]
+        pys = np.array([a.pos[1] for a in agents])[:, None]
+        sxs = np.array([p[0] for p, _ in slots])[None, :]
+        sys_ = np.array([p[1] for p, _ in slots])[None, :]
+        manhattan = np.abs(pxs - sxs) + np.abs(pys - sys_)
+        if not self.model.terrain.obstacles:
+            return manhattan
+        cells = [p for p, _ in slots]
+        pathfinder = self.model.pathfinder
+        out = np.empty(manhattan.shape)
+        for i, a in enumerate(agents):
+            found = pathfinder.distances(a.pos, cells)
+            out[i] = [found.get(p, m) for p, m in zip(cells, manhattan[i].tolist())]
+        return out
+
+    def _delegate(self, team: str):
+        key = "GOAL" if team == "GOAL" else "STATE"
+        if self._dispatched_structures[key]:  # uma STRUCTURE por vez
+            return
+        entry = self._pop_pending(team)
+        if entry is None:
+            return
+        best_pos = entry[2]
+        best_rt = self.beliefs[best_pos]
+        disp = self._dispatched(team)
+        self.bus.publish(
+            team,
             {
                 "type": "task",
                 "action": "collect",
@@ -65,4 +255,6 @@ class BDIAgent(Agent):
             },
         )
         disp.add(best_pos)
-        log(self, f"delegou {best_rt.name} ao time {team} em {best_pos}")
+        if best_rt == ResourceType.STRUCTURE:
+            self._dispatched_structures[key].add(best_pos)
+        log(self, "delegou %s ao time %s em %s", best_rt.name, team, best_pos)
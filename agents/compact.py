@@ -0,0 +1,129 @@
+"""Representação compacta de agentes e de suas memórias por célula.
+
+``CompactAgent`` cumpre o mesmo contrato do ``mesa.Agent`` (``unique_id``,
+``model``, ``pos``, ``random``, ``step``/``advance``), mas sem ``__dict__``:
+cada classe declara seus atributos em ``__slots__``. Herdar do ``mesa.Agent``
+manteria o ``__dict__`` (e, no CPython 3.11, o espaço reservado para ele)
+em cada instância.
+
+``CellBits`` e ``CellCounts`` guardam conjuntos e contadores de células em
+blocos de 8×8, criados só quando alguma célula do bloco é tocada: o custo
+cresce com a área explorada, não com o grid nem com uma tupla por célula.
+"""
+
+from array import array
+
+# blocos de 8×8 células: chave do bloco e bit/índice da célula dentro dele
+_SHIFT = 3
+_MASK = (1 << _SHIFT) - 1
+
+
+def _tile(x: int, y: int) -> int:
+    return (x >> _SHIFT) << 32 | (y >> _SHIFT)
+
+
+def _cell(x: int, y: int) -> int:
+    return (x & _MASK) << _SHIFT | (y & _MASK)
+
+
+def _cells(key: int, bits):
+    """Posições ``(x, y)`` do bloco ``key`` cujos índices estão em ``bits``."""
+    x0, y0 = (key >> 32) << _SHIFT, (key & 0xFFFFFFFF) << _SHIFT
+    for i in bits:
+        yield x0 + (i >> _SHIFT), y0 + (i & _MASK)
+
+
+class CompactAgent:
+    __slots__ = ("unique_id", "model", "pos")
+
+    def __init__(self, unique_id: int, model) -> None:
+        self.unique_id = unique_id
+        self.model = model
+        self.pos = None
+
+    def step(self) -> None:
+        pass
+
+    def advance(self) -> None:
+        pass
+
+    @property
+    def random(self):
+        return self.model.random
+
+
+def agent_state(agent) -> dict:
+    """Atributos de instância de ``agent``, lidos dos slots de toda a hierarquia."""
+    state = {}
+    for cls in reversed(type(agent).__mro__):
+        for name in cls.__dict__.get("__slots__", ()):
+            if hasattr(agent, name):
+                state[name] = getattr(agent, name)
+    return state
+
+
+class CellBits:
+    """Conjunto de células: um inteiro de 64 bits por bloco 8×8 tocado."""
+
+    __slots__ = ("_tiles",)
+
+    def __init__(self, cells=()):
+        self._tiles: dict[int, int] = {}
+        for pos in cells:
+            self.add(pos)
+
+    def add(self, pos):
+        x, y = pos
+        key = _tile(x, y)
+        tiles = self._tiles
+        tiles[key] = tiles.get(key, 0) | 1 << _cell(x, y)
+
+    def __contains__(self, pos) -> bool:
+        x, y = pos
+        return bool(self._tiles.get(_tile(x, y), 0) >> _cell(x, y) & 1)
+
+    def __len__(self) -> int:
+        return sum(bits.bit_count() for bits in self._tiles.values())
+
+    def __iter__(self):
+        for key, bits in self._tiles.items():
+            yield from _cells(key, (i for i in range(64) if bits >> i & 1))
+
+
+class CellCounts:
+    """Contador por célula: 64 inteiros de 16 bits por bloco 8×8 tocado.
+
+    As contagens param em 65535.
+    """
+
+    __slots__ = ("_tiles",)
+
+    def __init__(self):
+        self._tiles: dict[int, array] = {}
+
+    def add(self, pos, n: int = 1) -> int:
+        x, y = pos
+        key = _tile(x, y)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = self._tiles[key] = array("H", bytes(128))
+        i = _cell(x, y)
+        tile[i] = count = min(tile[i] + n, 0xFFFF)
+        return count
+
+    def __getitem__(self, pos) -> int:
+        x, y = pos
+        tile = self._tiles.get(_tile(x, y))
+        return tile[_cell(x, y)] if tile is not None else 0
+
+    def __len__(self) -> int:
+        return sum(64 - tile.count(0) for tile in self._tiles.values())
+
+    def items(self):
+        for key, tile in self._tiles.items():
+            cells = [i for i, n in enumerate(tile) if n]
+            for pos, i in zip(_cells(key, cells), cells):
+                yield pos, tile[i]
+
+    def __iter__(self):
+        return (pos for pos, _ in self.items())
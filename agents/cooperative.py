@@ -1,6 +1,8 @@
-from random import choice
-from mesa import Agent
-from environment.resource import ResourceType
+import numpy as np
+from agents.compact import CompactAgent
+from environment.resource import ResourceType, Tally
+from instrumentation.events import DEBUG, INFO
+from mesa_simulation.grid import WaitingFlag
 
 
 DISPLAY = {
@@ -17,21 +19,108 @@ def _hidden(rt):
     return ((v ^ _KEY) + v) * 1.5
 
 
-def log(a, m):
-    t = a.model.schedule.time
-    print(f"[Coop {a.unique_id:02} | t={t:03}] {m}")
+# _hidden indexado por ResourceType.value, o código guardado em resource_layer
+_HIDDEN = np.zeros(max(rt.value for rt in ResourceType) + 1)
+for _rt in ResourceType:
+    _HIDDEN[_rt.value] = _hidden(_rt)
+_STRUCTURE = ResourceType.STRUCTURE.value
 
 
-class CooperativeAgent(Agent):
+def score_targets(px, py, xs, ys, values, waiting):
+    """Utilidade de cada candidato para um agente em ``(px, py)``.
+
+    ``(1/(d+1)) · (1+w) · _hidden(rt)``, com ``w`` (parceiros esperando)
+    considerado apenas para STRUCTURE.
+    """
+    d = np.abs(xs - px) + np.abs(ys - py)
+    w = np.where(values == _STRUCTURE, waiting, 0)
+    return (1 / (d + 1)) * (1 + w) * _HIDDEN[values]
+
+
+def score_matrix(pxs, pys, xs, ys, values, waiting):
+    """Mesma utilidade de ``score_targets`` para vários agentes: agentes × candidatos."""
+    d = np.abs(xs[None, :] - pxs[:, None]) + np.abs(ys[None, :] - pys[:, None])
+    w = np.where(values == _STRUCTURE, waiting, 0)
+    return (1 / (d + 1)) * ((1 + w) * _HIDDEN[values])[None, :]
+
+
+def best_targets(agents, chunk_cells=4_000_000):
+    """Melhor candidato (índice em ``resource_arrays``) de cada agente.
+
+    Pontua todos os agentes contra todos os recursos como uma matriz,
+    processada em blocos de no máximo ``chunk_cells`` elementos. Recursos sem
+    caminho até a base ficam de fora; sem candidato, o índice é ``None``.
+    """
+    model = agents[0].model
+    grid = model.grid
+    xs, ys, values = model.resource_arrays()
+    if not len(xs):
+        return {}
+    unreachable = model.home.distances(xs, ys) < 0
+    waiting = grid.waiting[xs, ys]
+    pxs = np.array([a.pos[0] for a in agents])
+    pys = np.array([a.pos[1] for a in agents])
+    step = max(1, chunk_cells // len(xs))
+    best = {}
+    for i in range(0, len(agents), step):
+        rows = score_matrix(
+            pxs[i : i + step], pys[i : i + step], xs, ys, values, waiting
+        )
+        rows[:, unreachable] = -1.0
+        picks = rows.argmax(axis=1)
+        found = rows[np.arange(len(picks)), picks] >= 0
+        for a, j, ok in zip(agents[i : i + step], picks.tolist(), found.tolist()):
+            best[a.unique_id] = j if ok else None
+    return best
+
+
+def log(a, m, *args, level=INFO):
+    ev = a.model.events
+    if level >= ev.level:
+        ev.emit(level, "Coop", a.unique_id, a.model.schedule.time, m, args)
+
+
+class CooperativeAgent(CompactAgent):
+    __slots__ = (
+        "name",
+        "carrying",
+        "_waiting_for_help",
+        "target",
+        "plan",
+        "current_task",
+        "delivered",
+    )
+    waiting_for_help = WaitingFlag()
+
     def __init__(self, uid, model):
         super().__init__(uid, model)
         self.carrying = None
         self.waiting_for_help = False
-        self.sights: dict[tuple[int, int], ResourceType] = {}
         self.target = None
-        self.delivered = {rt: 0 for rt in ResourceType}
+        self.plan = None
+        self.current_task = None
+        self.delivered = Tally()
 
     def step(self):
+        self.perceive()
+        self.act()
+
+    def perceive(self):
+        """Lê tarefas e escolhe alvo e próximo passo sem alterar o mundo."""
+        self._receive_tasks()
+        self.plan = None
+        # o cooperativo enxerga o mapa todo
+        if (
+            self.carrying is None
+            and not self.waiting_for_help
+            and self.model.has_resources()
+        ):
+            target = self._task_target() or self._best()
+            if target is not None:
+                dest, rt = target
+                self.plan = (dest, rt, self.model.step_towards(self.pos, dest))
+
+    def act(self):
         if self.carrying:
             self._go_to_base()
             return
@@ -40,12 +129,11 @@ class CooperativeAgent(Agent):
         if self.waiting_for_help:
             self._check_partnership()
             return
-        self._scan()
-        if self.sights:
-            dest, rt = self._best()
+        if self.plan is not None:
+            dest, rt, nxt = self.plan
             self.target = dest
-            log(self, f"alvo {rt.name} em {dest}")
-            self._move(dest)
+            log(self, "alvo %s em %s", rt.name, dest, level=DEBUG)
+            self.model.safe_move(self, nxt)
             if self.pos == dest:
                 if rt == ResourceType.STRUCTURE:
                     self._check_partnership()
@@ -54,27 +142,40 @@ class CooperativeAgent(Agent):
             return
         self._walk()
 
+    def _receive_tasks(self):
+        for msg in self.model.message_bus.receive(str(self.unique_id)):
+            if msg.get("type") == "task" and msg.get("action") == "collect":
+                self.current_task = {
+                    "position": tuple(msg["position"]),
+                    "resource_type": msg["resource_type"],
+                }
+                log(
+                    self,
+                    "recebeu tarefa %s em %s",
+                    msg["resource_type"],
+                    msg["position"],
+                )
+
+    def _task_target(self):
+        if self.current_task is None:
+            return None
+        p = self.current_task["position"]
+        if not self.model.has_resource(p) or not self.model.reachable(p):
+            self.current_task = None
+            return None
+        return p, ResourceType[self.current_task["resource_type"]]
+
     def _collect_here(self):
-        for obj in self.model.grid.get_cell_list_contents([self.pos]):
-            rt = getattr(obj, "resource_type", None)
+        for obj in self.model.grid.resources_at(self.pos):
+            rt = obj.resource_type
             if rt in (ResourceType.CRYSTAL, ResourceType.METAL):
                 self.model.grid.remove_agent(obj)
                 self.carrying = rt
                 self.model.consume_resource_info(self.pos)
-                log(self, f"coletou {rt.name}")
+                log(self, "coletou %s", rt.name)
                 return True
         return False
 
-    def _scan(self):
-        self.sights.clear()
-        for x in range(self.model.grid.width):
-            for y in range(self.model.grid.height):
-                for obj in self.model.grid.get_cell_list_contents([(x, y)]):
-                    rt = getattr(obj, "resource_type", None)
-                    if rt is None:
-                        continue
-                    self.sights[(x, y)] = rt
-
     def _check_partnership(self):
         cell = self.model.grid.get_cell_list_contents([self.pos])
         struct = next(
@@ -102,7 +203,7 @@ class CooperativeAgent(Agent):
                     p._start_return(ResourceType.STRUCTURE)
             self.model.consume_resource_info(self.pos)
             ids = [p.unique_id for p in partners]
-            log(self, f"coletou STRUCTURE em equipe com {ids}")
+            log(self, "coletou STRUCTURE em equipe com %s", ids)
         else:
             self.waiting_for_help = True
             log(self, "chegou primeiro, aguardando parceiro")
@@ -114,46 +215,57 @@ class CooperativeAgent(Agent):
             self.delivered[self.carrying] += 1
             log(
                 self,
-                f"entregou {self.carrying.name} (total={self.delivered[self.carrying]})",
+                "entregou %s (total=%d)",
+                self.carrying.name,
+                self.delivered[self.carrying],
             )
             self.carrying = None
+            self.current_task = None
 
     def _move(self, dest):
-        x, y = self.pos
-        dx, dy = dest
-        if x < dx:
-            x += 1
-        elif x > dx:
-            x -= 1
-        elif y < dy:
-            y += 1
-        elif y > dy:
-            y -= 1
-        self.model.safe_move(self, (x, y))
+        self.model.safe_move(self, self.model.step_towards(self.pos, dest))
 
     def _walk(self):
-        nbrs = self.model.grid.get_neighborhood(
-            self.pos, moore=False, include_center=False
-        )
+        nbrs = self.model.free_neighbors(self.pos)
         if nbrs:
-            p = choice(nbrs)
+            p = self.random.choice(nbrs)
             self.model.safe_move(self, p)
-            log(self, f"andou para {p}")
+            log(self, "andou para %s", p, level=DEBUG)
 
     def _best(self):
-        best_p, best_rt, best_v = None, None, -1
-        for p, rt in self.sights.items():
-            d = abs(self.pos[0] - p[0]) + abs(self.pos[1] - p[1])
-            base_val = _hidden(rt)
-            if rt == ResourceType.STRUCTURE:
-                w = sum(
-                    1
-                    for a in self.model.grid.get_cell_list_contents([p])
-                    if getattr(a, "waiting_for_help", False)
-                )
-                val = (1 / (d + 1)) * (1 + w) * base_val
-            else:
-                val = (1 / (d + 1)) * base_val
-            if val > best_v:
-                best_p, best_rt, best_v = p, rt, val
-        return best_p, best_rt
+        """Recurso de maior utilidade entre os alcançáveis; ``None`` se nenhum."""
+        grid = self.model.grid
+        xs, ys, values = self.model.resource_arrays()
+        if self.model.batch_coop_scoring:
+            i = self._batch_best()
+        else:
+            scores = score_targets(
+                self.pos[0], self.pos[1], xs, ys, values, grid.waiting[xs, ys]
+            )
+            scores[self.model.home.distances(xs, ys) < 0] = -1.0
+            i = int(scores.argmax())
+            if scores[i] < 0:
+                i = None
+        if i is None:
+            return None
+        return (int(xs[i]), int(ys[i])), ResourceType(int(values[i]))
+
+    def _batch_best(self):
+        # uma matriz por passo para todos os cooperativos; refeita só se
+        # recursos ou agentes em espera mudarem desde o último cálculo
+        model = self.model
+        key = (
+            model.schedule.time,
+            model.grid.resource_version,
+            model.remote_version,
+            model.grid.waiting_version,
+        )
+        cache = model.coop_targets
+        if cache is None or cache[0] != key or self.unique_id not in cache[1]:
+            agents = [
+                a
+                for a in model.schedule.agents
+                if isinstance(a, CooperativeAgent) and a.pos is not None
+            ]
+            cache = model.coop_targets = (key, best_targets(agents))
+        return cache[1][self.unique_id]
@@ -1,7 +1,8 @@
 from math import dist
-from random import choice
-from mesa import Agent
-from environment.resource import ResourceType
+from agents.compact import CompactAgent
+from environment.resource import ResourceType, Tally
+from instrumentation.events import DEBUG, INFO
+from mesa_simulation.grid import WaitingFlag
 
 VALUE = {
     ResourceType.CRYSTAL: 10,
@@ -10,25 +11,68 @@ VALUE = {
 }
 
 
-def log(agent, msg: str) -> None:
-    step = agent.model.schedule.time
-    print(f"[GoalBased {agent.unique_id:02} | t={step:03}] {msg}")
+def log(agent, msg: str, *args, level: int = INFO) -> None:
+    events = agent.model.events
+    if level >= events.level:
+        events.emit(
+            level, "GoalBased", agent.unique_id, agent.model.schedule.time, msg, args
+        )
+
 
+class GoalBasedAgent(CompactAgent):
+    __slots__ = (
+        "name",
+        "carrying",
+        "_waiting_for_help",
+        "current_task",
+        "known",
+        "_removed_cursor",
+        "path",
+        "planned",
+        "_sightings",
+        "delivered",
+    )
+    waiting_for_help = WaitingFlag()
 
-class GoalBasedAgent(Agent):
     def __init__(self, uid, model):
         super().__init__(uid, model)
         self.carrying = None
         self.waiting_for_help = False
         self.current_task = None
-        self.known: dict[tuple[int, int], ResourceType] = {}
+        # conhecimento compartilhado do modelo mais as posições avistadas
+        # que ele ainda não recebeu
+        self.known = model.known_resources.view()
+        self._removed_cursor = len(model.grid.removed)
+        # caminho de trás para frente: o próximo passo é o último item
         self.path: list[tuple[int, int]] = []
-        self.delivered = {rt: 0 for rt in ResourceType}
+        self.planned = False
+        self._sightings: list = []
+        self.delivered = Tally()
         model.message_bus.register(str(uid))
+        model.message_bus.subscribe("GOAL", str(uid))
 
     def step(self):
+        self.perceive()
+        self.act()
+
+    def perceive(self):
+        """Atualiza crenças e tarefas e, se estiver livre, já planeja o caminho."""
         self._sync_beliefs()
         self._receive_tasks()
+        # sem nada a fazer na célula atual, o próximo alvo não depende de act;
+        # exploração aleatória fica para act, que é quem sorteia
+        self.planned = (
+            not self.path
+            and self.carrying is None
+            and not self.waiting_for_help
+            and bool(self.known)
+            and not self.model.grid.resources_at(self.pos)
+        )
+        if self.planned:
+            self._deliberate()
+
+    def act(self):
+        self._report_sightings()
         if self.carrying and self.pos == self.model.base_position:
             self._deliver()
         if self.carrying is None:
@@ -36,14 +80,17 @@ class GoalBasedAgent(Agent):
                 self._check_for_partner()
             else:
                 self._look_and_collect()
-        if not self.path:
+        if not self.path and not self.planned:
             self._deliberate()
+        self.planned = False
         if self.path:
             self._follow_path()
 
     def _receive_tasks(self):
-        for chan in (str(self.unique_id), "broadcast_GOAL"):
-            for msg in self.model.message_bus.receive(chan):
+        bus = self.model.message_bus
+        uid = str(self.unique_id)
+        for msgs in (bus.receive(uid), bus.poll("GOAL", uid)):
+            for msg in msgs:
                 if msg.get("type") == "task" and msg.get("action") == "collect":
                     self.current_task = {
                         "position": tuple(msg["position"]),
@@ -52,50 +99,64 @@ class GoalBasedAgent(Agent):
                     self.path.clear()
                     log(
                         self,
-                        f"recebeu tarefa {msg['resource_type']} em {msg['position']}",
+                        "recebeu tarefa %s em %s",
+                        msg["resource_type"],
+                        msg["position"],
                     )
 
     def _sync_beliefs(self):
-        self.known.update(self.model.known_resources)
-        for p in list(self.known):
-            if not any(
-                hasattr(o, "resource_type")
-                for o in self.model.grid.get_cell_list_contents([p])
-            ):
+        # a loja compartilhada já está em dia; só as posições avistadas por
+        # este agente precisam das remoções desde a última sincronização
+        grid = self.model.grid
+        removed = grid.removed
+        for p in removed[self._removed_cursor :]:
+            if not grid.resources_at(p):
                 self.known.pop(p, None)
-                self.model.consume_resource_info(p)
+        self._removed_cursor = len(removed)
         for p in self.model.grid.get_neighborhood(
             self.pos, moore=False, include_center=True
         ):
-            for obj in self.model.grid.get_cell_list_contents([p]):
-                if not hasattr(obj, "resource_type"):
-                    continue
+            for obj in self.model.grid.resources_at(p):
                 rt = obj.resource_type
                 if p not in self.known:
-                    log(self, f"avistou {rt.name} em {p}")
+                    log(self, "avistou %s em %s", rt.name, p, level=DEBUG)
                 self.known[p] = rt
-                self.model.message_bus.send(
-                    "BDI",
-                    {
-                        "type": "belief",
-                        "data": {"position": p, "resource_type": rt.name},
-                    },
-                )
+                self._sightings.append((p, rt))
+
+    def _report_sightings(self):
+        for p, rt in self._sightings:
+            self.model.message_bus.send(
+                "BDI",
+                {"type": "belief", "data": {"position": p, "resource_type": rt.name}},
+                sender=str(self.unique_id),
+                key=p,
+            )
+        self._sightings.clear()
 
     def _deliberate(self):
-        if self.current_task and tuple(self.current_task["position"]) in self.known:
-            goal = tuple(self.current_task["position"])
-            self.path = self._plan_path(self.pos, goal)
-            log(self, f"priorizou tarefa em {goal}")
+        reachable = self.model.reachable
+        if self.carrying:
+            # caminho de volta perdido (bloqueio, tarefa nova ou migração)
+            self.path = self._plan_path(self.pos, self.model.base_position)
             return
-        if not self.known:
+        if self.current_task:
+            goal = tuple(self.current_task["position"])
+            if goal in self.known and reachable(goal):
+                self.path = self._plan_path(self.pos, goal)
+                log(self, "priorizou tarefa em %s", goal)
+                return
+            if goal in self.known:
+                log(self, "descartou tarefa inalcançável em %s", goal)
+                self.current_task = None
+        candidates = [kv for kv in self.known.items() if reachable(kv[0])]
+        if not candidates:
             self._random_explore()
             return
         best_pos, best_rt = min(
-            self.known.items(), key=lambda kv: (-VALUE[kv[1]], dist(self.pos, kv[0]))
+            candidates, key=lambda kv: (-VALUE[kv[1]], dist(self.pos, kv[0]))
         )
         self.path = self._plan_path(self.pos, best_pos)
-        log(self, f"selecionou {best_rt.name} em {best_pos} como próximo alvo")
+        log(self, "selecionou %s em %s como próximo alvo", best_rt.name, best_pos)
 
     def _look_and_collect(self):
         cell = self.model.grid.get_cell_list_contents([self.pos])
@@ -144,13 +205,13 @@ class GoalBasedAgent(Agent):
         self.model.consume_resource_info(self.pos)
 
         ids = [p.unique_id for p in partners]
-        log(self, f"coletou STRUCTURE em equipe com {ids}")
+        log(self, "coletou STRUCTURE em equipe com %s", ids)
 
     def _start_return(self, rt):
         self.carrying = rt
-        self.known.pop(self.pos, None)
         self.model.consume_resource_info(self.pos)
-        log(self, f"coletou {rt.name}, voltando à base")
+        self.known.pop(self.pos, None)
+        log(self, "coletou %s, voltando à base", rt.name)
         self.path = self._plan_path(self.pos, self.model.base_position)
 
     def _deliver(self):
@@ -158,39 +219,27 @@ class GoalBasedAgent(Agent):
         self.delivered[self.carrying] += 1
         log(
             self,
-            f"entregou {self.carrying.name} (total={self.delivered[self.carrying]})",
+            "entregou %s (total=%d)",
+            self.carrying.name,
+            self.delivered[self.carrying],
         )
         self.carrying = None
         self.current_task = None
         self.path.clear()
 
     def _follow_path(self):
-        nxt = self.path.pop(0)
+        nxt = self.path.pop()
         self.model.safe_move(self, nxt)
-        log(self, f"moveu para {nxt}")
+        if self.pos != nxt:  # bloqueado: replaneja no próximo passo
+            self.path.clear()
+        log(self, "moveu para %s", nxt, level=DEBUG)
 
     def _random_explore(self):
-        nbrs = self.model.grid.get_neighborhood(
-            self.pos, moore=False, include_center=False
-        )
+        nbrs = self.model.free_neighbors(self.pos)
         if nbrs:
-            t = choice(nbrs)
+            t = self.random.choice(nbrs)
             self.path = [t]
-            log(self, f"explorou para {t}")
-
-    @staticmethod
-    def _plan_path(s, g):
-        x, y = s
-        gx, gy = g
-        path = []
-        while (x, y) != (gx, gy):
-            if x < gx:
-                x += 1
-            elif x > gx:
-                x -= 1
-            elif y < gy:
-                y += 1
-            elif y > gy:
-                y -= 1
-            path.append((x, y))
-        return path
+            log(self, "explorou para %s", t, level=DEBUG)
+
+    def _plan_path(self, s, g):
+        return self.model.plan_path(s, g)[::-1]
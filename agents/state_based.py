@@ -1,27 +1,50 @@
-from random import choice
-from mesa import Agent
-from environment.resource import ResourceType
+from agents.compact import CellBits, CellCounts, CompactAgent
+from environment.resource import ResourceType, Tally
+from instrumentation.events import DEBUG, INFO
+from mesa_simulation.grid import WaitingFlag
 
 
-def log(agent, msg: str) -> None:
-    step = agent.model.schedule.time
-    print(f"[StateBased {agent.unique_id:02} | t={step:03}] {msg}")
+def log(agent, msg: str, *args, level: int = INFO) -> None:
+    events = agent.model.events
+    if level >= events.level:
+        events.emit(
+            level, "StateBased", agent.unique_id, agent.model.schedule.time, msg, args
+        )
+
 
+class StateBasedAgent(CompactAgent):
+    __slots__ = (
+        "name",
+        "memory",
+        "visit",
+        "carrying",
+        "_waiting_for_help",
+        "current_task",
+        "delivered",
+    )
+    waiting_for_help = WaitingFlag()
 
-class StateBasedAgent(Agent):
     def __init__(self, uid, model):
         super().__init__(uid, model)
-        self.memory: set[tuple[int, int]] = set()
-        self.visit: dict[tuple[int, int], int] = {}
+        # células já vistas ou visadas e quantas vezes esteve em cada uma
+        self.memory = CellBits()
+        self.visit = CellCounts()
         self.carrying: ResourceType | None = None
         self.waiting_for_help: bool = False
         self.current_task: dict | None = None
-        self.delivered = {rt: 0 for rt in ResourceType}
+        self.delivered = Tally()
+        model.message_bus.subscribe("STATE", str(uid))
 
     def step(self) -> None:
+        self.perceive()
+        self.act()
+
+    def perceive(self) -> None:
         self.memory.add(self.pos)
-        self.visit[self.pos] = self.visit.get(self.pos, 0) + 1
+        self.visit.add(self.pos)
         self._receive_tasks()
+
+    def act(self) -> None:
         if self.carrying:
             self._return_to_base()
             return
@@ -41,18 +64,23 @@ class StateBasedAgent(Agent):
             or (self.current_task and self.pos != tuple(self.current_task["position"]))
         ):
             return
-        for msg in self.model.message_bus.receive(str(self.unique_id)):
+        bus = self.model.message_bus
+        uid = str(self.unique_id)
+        for msg in bus.receive(uid) + bus.poll("STATE", uid):
             if msg.get("type") == "task" and msg.get("action") == "collect":
                 self.current_task = {
                     "position": tuple(msg["position"]),
                     "resource_type": msg["resource_type"],
                 }
-                log(self, f"recebeu tarefa em {msg['position']}")
+                log(self, "recebeu tarefa em %s", msg["position"])
 
     def _belief(self, p, r) -> None:
         self.model.report_resource(p, r)
         self.model.message_bus.send(
-            "BDI", {"type": "belief", "data": {"position": p, "resource_type": r.name}}
+            "BDI",
+            {"type": "belief", "data": {"position": p, "resource_type": r.name}},
+            sender=str(self.unique_id),
+            key=p,
         )
 
     def _check_partners(self) -> None:
@@ -77,22 +105,28 @@ class StateBasedAgent(Agent):
         if not partners:
             return
         self.model.grid.remove_agent(struct)
+        self.model.consume_resource_info(self.pos)
         self.carrying = ResourceType.STRUCTURE
         self.waiting_for_help = False
         for p in partners:
             p.carrying = ResourceType.STRUCTURE
             p.waiting_for_help = False
         ids = [p.unique_id for p in partners]
-        log(self, f"coletou STRUCTURE em equipe com {ids}")
+        log(self, "coletou STRUCTURE em equipe com %s", ids)
 
     def _execute_task(self):
         dest = self.current_task["position"]
+        if not self.model.reachable(dest):
+            log(self, "tarefa inalcançável em %s, descartada", dest)
+            self.current_task = None
+            self._explore()
+            return
         self.memory.add(dest)
         self._move_towards(dest)
         if self.pos == dest:
             self._look_around()
             if self.carrying is None and not self.waiting_for_help:
-                log(self, f"tarefa falhou, recurso não encontrado em {dest}")
+                log(self, "tarefa falhou, recurso não encontrado em %s", dest)
                 self.current_task = None
 
     def _look_around(self) -> None:
@@ -100,16 +134,15 @@ class StateBasedAgent(Agent):
             self.pos, moore=False, include_center=True
         )
         for p in nb:
-            for obj in self.model.grid.get_cell_list_contents([p]):
-                if not hasattr(obj, "resource_type"):
-                    continue
+            for obj in self.model.grid.resources_at(p):
                 rt = obj.resource_type
                 self._belief(p, rt)
                 if p == self.pos:
                     if rt in (ResourceType.CRYSTAL, ResourceType.METAL):
                         self.model.grid.remove_agent(obj)
+                        self.model.consume_resource_info(p)
                         self.carrying = rt
-                        log(self, f"coletou {rt.name}")
+                        log(self, "coletou %s", rt.name)
                         self.current_task = None
                         return
                     if rt == ResourceType.STRUCTURE:
@@ -123,7 +156,7 @@ class StateBasedAgent(Agent):
                         and not self.current_task
                     ):
                         self.current_task = {"position": p, "resource_type": rt.name}
-                        log(self, f"definiu alvo em {p}")
+                        log(self, "definiu alvo em %s", p)
                         return
 
     def _return_to_base(self):
@@ -133,30 +166,23 @@ class StateBasedAgent(Agent):
             self.delivered[self.carrying] += 1
             log(
                 self,
-                f"entregou {self.carrying.name} (total={self.delivered[self.carrying]})",
+                "entregou %s (total=%d)",
+                self.carrying.name,
+                self.delivered[self.carrying],
             )
             self.carrying = None
             self.current_task = None
 
     def _move_towards(self, dest: tuple[int, int]) -> None:
-        x, y = self.pos
-        dx, dy = dest
-        if x < dx:
-            x += 1
-        elif x > dx:
-            x -= 1
-        elif y < dy:
-            y += 1
-        elif y > dy:
-            y -= 1
-        self.model.safe_move(self, (x, y))
-        log(self, f"moveu para {(x, y)}")
+        nxt = self.model.step_towards(self.pos, dest)
+        self.model.safe_move(self, nxt)
+        log(self, "moveu para %s", nxt, level=DEBUG)
 
     def _explore(self) -> None:
-        nbrs = self.model.grid.get_neighborhood(
-            self.pos, moore=False, include_center=False
-        )
+        nbrs = self.model.free_neighbors(self.pos)
+        if not nbrs:
+            return
         unseen = [p for p in nbrs if p not in self.memory]
-        tgt = choice(unseen) if unseen else choice(nbrs)
+        tgt = self.random.choice(unseen) if unseen else self.random.choice(nbrs)
         self.model.safe_move(self, tgt)
-        log(self, f"explorou para {tgt}")
+        log(self, "explorou para %s", tgt, level=DEBUG)
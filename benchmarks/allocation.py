@@ -0,0 +1,90 @@
+"""Utilidade com a alocação do BDI (``allocation_interval``) contra a delegação antiga.
+
+Roda os mesmos cenários e seeds com ``allocation_interval=0`` (um anúncio por
+time, o padrão) e com o valor pedido (matriz agentes × vagas resolvida pelo
+algoritmo húngaro), e compara a utilidade média e as entregas por classe:
+
+    python -m benchmarks.allocation --seeds 12 -o alocacao.json
+    python -m benchmarks.allocation --scale 60 5 180 100 --scale 60 2 60 40
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.stepping import scaled_scenario
+from instrumentation.events import EventLogger
+from mesa_simulation.model import ResourceModel
+
+# (lado do grid, agentes de cada tipo, recursos, obstáculos)
+SCALES = ((60, 2, 60, 40), (60, 5, 180, 100), (60, 5, 100, 300))
+
+
+def run(params: dict, seed: int, interval: int, steps: int) -> dict:
+    model = ResourceModel(
+        **params,
+        events=EventLogger(level="OFF"),
+        seed=seed,
+        allocation_interval=interval,
+    )
+    while model.running and model.schedule.time < steps:
+        model.step()
+    delivered = {}
+    for a in model.schedule.agents:
+        if hasattr(a, "delivered"):
+            name = type(a).__name__
+            delivered[name] = delivered.get(name, 0) + sum(a.delivered.values())
+    return {"utility": model.base.get_total_utility(), "delivered": delivered}
+
+
+def compare(scale, seeds: int, interval: int, steps: int) -> dict:
+    params = scaled_scenario(*scale)
+    out = {"scale": list(scale)}
+    for label, every in (("delegation", 0), ("allocation", interval)):
+        runs = [run(params, seed, every, steps) for seed in range(seeds)]
+        delivered = {}
+        for r in runs:
+            for name, n in r["delivered"].items():
+                delivered[name] = delivered.get(name, 0) + n / seeds
+        out[label] = {
+            "mean_utility": sum(r["utility"] for r in runs) / seeds,
+            "mean_delivered": delivered,
+            "utility": [r["utility"] for r in runs],
+        }
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="grava os resultados em JSON")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        nargs=4,
+        action="append",
+        metavar=("LADO", "POR_TIPO", "RECURSOS", "OBSTACULOS"),
+    )
+    parser.add_argument("--seeds", type=int, default=6)
+    parser.add_argument("--interval", type=int, default=1)
+    parser.add_argument("--steps", type=int, default=400)
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scale or SCALES:
+        r = compare(scale, args.seeds, args.interval, args.steps)
+        results.append(r)
+        print(
+            f"{'x'.join(map(str, scale)):<16} "
+            f"delegação {r['delegation']['mean_utility']:8.1f}  "
+            f"alocação {r['allocation']['mean_utility']:8.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"seeds": args.seeds, "results": results}, fh, indent=2)
+            fh.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
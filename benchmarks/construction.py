@@ -0,0 +1,100 @@
+"""Tempo de montagem do ``ResourceModel`` em função do número de recursos.
+
+Para cada quantidade de recursos monta o mesmo mundo duas vezes: com a lista
+de dicts de ``server.params`` e com a forma em colunas
+(``{"positions": ..., "types": ...}``), e grava os tempos em JSON:
+
+    python -m benchmarks.construction -o construcao.json
+    python -m benchmarks.construction --counts 1000 100000 --side 1000
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from environment.resource import ResourceType
+from instrumentation.events import EventLogger
+from mesa_simulation.model import ResourceModel
+
+COUNTS = (1_000, 10_000, 100_000)
+VALUES = np.array([rt.value for rt in ResourceType])
+NAMES = [rt.name for rt in ResourceType]
+
+
+def world(side: int, resources: int, obstacles: int, agents: int, seed: int = 0):
+    """Mundo ``side × side`` gerado com seed fixa, nas duas formas de entrada."""
+    rng = np.random.default_rng(seed)
+    pos = rng.integers(1, side, size=(resources, 2))
+    kinds = rng.integers(0, len(VALUES), size=resources)
+    blocked = rng.integers(1, side, size=(obstacles, 2))
+    base = {
+        "width": side,
+        "height": side,
+        "agent_configs": [{"type": "BDI", "position": [0, 0]}]
+        + [{"type": "REACTIVE", "position": [0, 0]} for _ in range(agents)],
+    }
+    columns = {
+        **base,
+        "resources": {"positions": pos, "types": VALUES[kinds]},
+        "obstacles": blocked,
+    }
+    dicts = {
+        **base,
+        "resources": [
+            {"type": NAMES[k], "position": p}
+            for k, p in zip(kinds.tolist(), pos.tolist())
+        ],
+        "obstacles": blocked.tolist(),
+    }
+    return dicts, columns
+
+
+def _build_seconds(params: dict, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        ResourceModel(**params, events=EventLogger(level="OFF"), seed=0)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(side: int, resources: int, agents: int, repeat: int = 3) -> dict:
+    dicts, columns = world(side, resources, resources // 5, agents)
+    return {
+        "grid": [side, side],
+        "resources": resources,
+        "dicts_s": _build_seconds(dicts, repeat),
+        "columns_s": _build_seconds(columns, repeat),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="grava os resultados em JSON")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(COUNTS))
+    parser.add_argument("--side", type=int, default=500, help="lado do grid")
+    parser.add_argument("--agents", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in args.counts:
+        r = bench(args.side, n, args.agents, args.repeat)
+        results.append(r)
+        print(
+            f"{n:8d} recursos  dicts {r['dicts_s'] * 1e3:8.1f} ms  "
+            f"colunas {r['columns_s'] * 1e3:8.1f} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"side": args.side, "results": results}, fh, indent=2)
+            fh.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Memória por agente de cada classe e por recurso, medida com ``tracemalloc``.
+
+Para cada tipo de agente monta um mundo com um agente e outro com ``--agents``
+agentes do mesmo tipo, roda ``--steps`` passos e divide a diferença: o que
+sobra é o custo de um agente (objeto, memórias, caixa de entrada, registro no
+escalonador e no grid), incluindo o que ele acumula ao andar.
+
+    python -m benchmarks.memory -o memoria.json
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+
+from instrumentation.events import EventLogger
+from mesa_simulation import scenario
+from mesa_simulation.model import ResourceModel
+
+KINDS = ("REACTIVE", "STATE_BASED", "GOAL_BASED", "COOPERATIVE")
+
+
+def _traced(params: dict, steps: int) -> tuple[int, int]:
+    """Bytes alocados ao montar o modelo e depois de ``steps`` passos."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        model = ResourceModel(**params, events=EventLogger(level="OFF"), seed=0)
+        built = tracemalloc.get_traced_memory()[0]
+        for _ in range(steps):
+            model.step()
+        return built, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def per_agent(kind: str, agents: int, steps: int, side: int = 300) -> dict:
+    world = scenario.generate(side, side, 2_000, clusters=20, seed=1, agents={})
+    config = {"type": kind, "position": [0, 0]}
+    one = _traced({**world, "agent_configs": [config]}, steps)
+    many = _traced({**world, "agent_configs": [config] * agents}, steps)
+    n = agents - 1
+    return {
+        "built_bytes": (many[0] - one[0]) / n,
+        "after_steps_bytes": (many[1] - one[1]) / n,
+    }
+
+
+def per_resource(resources: int, side: int = 300) -> float:
+    empty = scenario.generate(side, side, 0, seed=1, agents={})
+    full = scenario.generate(side, side, resources, seed=1, agents={})
+    return (_traced(full, 0)[0] - _traced(empty, 0)[0]) / resources
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="grava os resultados em JSON")
+    parser.add_argument("--agents", type=int, default=2_000)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--resources", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    report = {"steps": args.steps, "agents": {}}
+    for kind in KINDS:
+        r = report["agents"][kind] = per_agent(kind, args.agents, args.steps)
+        print(
+            f"{kind:<12} {r['built_bytes']:7.0f} B/agente na criação  "
+            f"{r['after_steps_bytes']:7.0f} B/agente após {args.steps} passos"
+        )
+    report["resource_bytes"] = per_resource(args.resources)
+    print(f"{'recurso':<12} {report['resource_bytes']:7.0f} B/recurso")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
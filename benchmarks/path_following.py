@@ -0,0 +1,101 @@
+"""Custo por viagem de planejar e seguir um caminho no GoalBasedAgent.
+
+Compara a representação antiga (lista consumida com ``pop(0)``) com a atual
+(lista invertida consumida com ``pop()``) e cronometra os métodos do próprio
+agente em uma viagem de canto a canto: ``_plan_path`` pelo campo de
+distâncias (destino na base) e pelo A* (com e sem cache), e ``_follow_path``
+até o fim do caminho.
+
+    python -m benchmarks.path_following --size 1000
+"""
+
+import argparse
+import timeit
+
+from instrumentation.events import EventLogger
+from mesa_simulation.model import ResourceModel
+
+
+def manhattan_path(s, g):
+    x, y = s
+    gx, gy = g
+    path = []
+    while (x, y) != (gx, gy):
+        if x < gx:
+            x += 1
+        elif x > gx:
+            x -= 1
+        elif y < gy:
+            y += 1
+        elif y > gy:
+            y -= 1
+        path.append((x, y))
+    return path
+
+
+def follow_list(path):
+    path = list(path)
+    while path:
+        path.pop(0)
+
+
+def follow_reversed(path):
+    path = path[::-1]
+    while path:
+        path.pop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    n = args.size
+    start, base = (n - 1, n - 1), (0, 0)
+    # viagem do A* com o mesmo comprimento, entre os outros dois cantos
+    a_start, a_goal = (n - 1, 0), (0, n - 1)
+    path = manhattan_path(start, base)
+
+    model = ResourceModel(
+        n,
+        n,
+        [{"type": "GOAL_BASED", "position": list(start)}],
+        [],
+        [],
+        events=EventLogger(level="OFF"),
+        seed=0,
+    )
+    agent = model.schedule.agents[0]
+    build = timeit.timeit(model.home._build, number=1)
+
+    def plan_cold():
+        model.pathfinder._hops.clear()
+        agent._plan_path(a_start, a_goal)
+
+    def trip():
+        model.grid.move_agent(agent, start)
+        agent.path = agent._plan_path(start, base)
+        while agent.path:
+            agent._follow_path()
+
+    rows = [
+        ("lista + pop(0)", lambda: follow_list(path)),
+        ("lista invertida + pop()", lambda: follow_reversed(path)),
+        ("_plan_path (campo)", lambda: agent._plan_path(start, base)),
+        ("_plan_path (A*)", plan_cold),
+        ("_plan_path (A*, cache)", lambda: agent._plan_path(a_start, a_goal)),
+        ("_plan_path + _follow_path", trip),
+    ]
+    print(f"grid {n}x{n}, viagem de {len(path)} passos")
+    print(f"construção do campo de distâncias: {build * 1e3:.1f} ms (uma vez)")
+    for name, fn in rows:
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(
+            f"{name:<26} {best * 1e3:8.2f} ms/viagem "
+            f"{best / len(path) * 1e9:8.0f} ns/passo"
+        )
+
+
+if __name__ == "__main__":
+    main()
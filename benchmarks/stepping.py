@@ -0,0 +1,223 @@
+"""Desempenho do ``ResourceModel`` passo a passo em cenários fixos.
+
+Para cada cenário mede passos por segundo, o tempo de ``step()`` por classe
+de agente, o pico de memória (``tracemalloc``) e o volume do ``MessageBus``,
+e grava tudo em JSON para comparar commits:
+
+    python -m benchmarks.stepping -o antes.json
+    python -m benchmarks.stepping -o depois.json --baseline antes.json
+
+O cenário ``server`` é o mapa de ``server.params`` (o mesmo de
+``examples/sweep.json``); os demais crescem grid, agentes e recursos.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from instrumentation.events import EventLogger
+from mesa_simulation.batch import expand_runs, load_config
+from mesa_simulation.model import ResourceModel
+
+SWEEP = os.path.join(os.path.dirname(__file__), "..", "examples", "sweep.json")
+KINDS = ("REACTIVE", "STATE_BASED", "GOAL_BASED", "COOPERATIVE")
+
+# nome: (lado do grid, agentes de cada tipo, recursos, obstáculos)
+SCALES = {
+    "small": (40, 2, 80, 40),
+    "medium": (100, 10, 500, 300),
+    "large": (200, 40, 2000, 1200),
+}
+
+
+def server_scenario() -> dict:
+    """A variante ``server`` de ``examples/sweep.json``, igual a ``server.params``."""
+    run = next(r for r in expand_runs(load_config(SWEEP)) if r["variant"] == "server")
+    return run["params"]
+
+
+def scaled_scenario(size: int, per_kind: int, resources: int, obstacles: int) -> dict:
+    """Mapa ``size × size`` gerado com seed fixa: mesmo cenário em todo commit."""
+    rng = random.Random(size)
+    free = [(x, y) for x in range(size) for y in range(size) if (x, y) != (0, 0)]
+    rng.shuffle(free)
+    blocked = free[:obstacles]
+    cells = free[obstacles:]
+    return {
+        "width": size,
+        "height": size,
+        "agent_configs": [{"type": "BDI", "position": [0, 0]}]
+        + [
+            {"type": kind, "position": [0, 0]}
+            for kind in KINDS
+            for _ in range(per_kind)
+        ],
+        "resources": [
+            {
+                "type": rng.choice(["CRYSTAL", "METAL", "STRUCTURE"]),
+                "position": list(rng.choice(cells)),
+            }
+            for _ in range(resources)
+        ],
+        "obstacles": [list(p) for p in blocked],
+    }
+
+
+def scenarios() -> dict:
+    found = {"server": server_scenario()}
+    for name, spec in SCALES.items():
+        found[name] = scaled_scenario(*spec)
+    return found
+
+
+def _timed(fn, totals, key):
+    def wrapper(self):
+        t0 = time.perf_counter()
+        fn(self)
+        totals[key] += time.perf_counter() - t0
+
+    return wrapper
+
+
+def _run(params: dict, steps: int, seed: int, by_class: bool):
+    model = ResourceModel(**params, events=EventLogger(level="OFF"), seed=seed)
+    model.max_steps = steps
+    totals, counts, patched = {}, {}, {}
+    if by_class:
+        # agentes usam __slots__, então o step cronometrado vai na classe
+        for agent in model.schedule.agents:
+            cls = type(agent)
+            name = cls.__name__
+            totals.setdefault(name, 0.0)
+            counts[name] = counts.get(name, 0) + 1
+            if cls not in patched:
+                patched[cls] = cls.__dict__.get("step")
+                cls.step = _timed(cls.step, totals, name)
+    t0 = time.perf_counter()
+    try:
+        while model.running and model.schedule.time < steps:
+            model.step()
+    finally:
+        for cls, original in patched.items():
+            if original is None:
+                del cls.step
+            else:
+                cls.step = original
+    return model, time.perf_counter() - t0, totals, counts
+
+
+def _bus_volume(model) -> dict:
+    bus = model.message_bus
+    stats = bus.stats().values()
+    return {
+        "sent": sum(c["sent"] for c in stats),
+        "received": sum(c["received"] for c in stats),
+        "dropped": sum(c["dropped"] for c in stats),
+        "coalesced": sum(c["coalesced"] for c in stats),
+        "duplicates": bus.duplicates,
+        "published": sum(t["published"] for t in bus.topic_stats().values()),
+    }
+
+
+def bench(params: dict, steps: int, seed: int = 0, memory: bool = True) -> dict:
+    model, elapsed, totals, counts = _run(params, steps, seed, by_class=False)
+    ran = model.schedule.time
+    _, _, totals, counts = _run(params, steps, seed, by_class=True)
+    result = {
+        "agents": len(params["agent_configs"]),
+        "resources": len(params["resources"]),
+        "grid": [params["width"], params["height"]],
+        "steps": ran,
+        "seconds": elapsed,
+        "steps_per_sec": ran / elapsed if elapsed else None,
+        "utility": model.base.get_total_utility(),
+        "step_us": {
+            name: totals[name] / (counts[name] * ran) * 1e6 if ran else None
+            for name in totals
+        },
+        "bus": _bus_volume(model),
+    }
+    if memory:
+        tracemalloc.start()
+        _run(params, steps, seed, by_class=False)
+        result["peak_mib"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(__file__),
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="grava os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        help="roda só este cenário (pode repetir): server, small, medium, large",
+    )
+    parser.add_argument("--no-memory", action="store_true", help="pula o tracemalloc")
+    args = parser.parse_args(argv)
+
+    available = scenarios()
+    names = args.scenario or list(available)
+    unknown = [n for n in names if n not in available]
+    if unknown:
+        parser.error(f"cenário desconhecido: {', '.join(unknown)}")
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)["scenarios"]
+
+    report = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "steps": args.steps,
+        "seed": args.seed,
+        "scenarios": {},
+    }
+    for name in names:
+        r = bench(available[name], args.steps, args.seed, memory=not args.no_memory)
+        report["scenarios"][name] = r
+        line = (
+            f"{name:<8} {r['agents']:4d} agentes {r['resources']:5d} recursos "
+            f"{r['steps_per_sec']:9.1f} passos/s"
+        )
+        if "peak_mib" in r:
+            line += f" {r['peak_mib']:7.1f} MiB"
+        old = baseline.get(name, {}).get("steps_per_sec")
+        if old:
+            line += f"  ({r['steps_per_sec'] / old:5.2f}x)"
+        print(line)
+        for cls, us in sorted(r["step_us"].items()):
+            print(f"    {cls:<16} {us:9.1f} µs/step")
+        print(f"    bus {r['bus']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
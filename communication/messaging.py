@@ -1,26 +1,335 @@
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+LATEST_ONLY = "latest-only"
+POLICIES = (DROP_OLDEST, DROP_NEWEST, LATEST_ONLY)
+BROADCAST = "broadcast"
+
+
+class Message(dict):
+    """Mensagem imutável, compartilhada por todos os assinantes de um tópico."""
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Mensagens publicadas são imutáveis")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (Message, (dict(self),))
+
+
+class Topic:
+    """Buffer circular de mensagens publicadas; cada assinante guarda só um cursor.
+
+    Publicar custa O(1) independentemente do número de assinantes. Um assinante
+    que fica mais de ``capacity`` mensagens atrás perde as mais antigas (contadas
+    em ``missed``).
+    """
+
+    def __init__(self, name: str, capacity: int = 256):
+        self.name = name
+        self.capacity = capacity
+        self._ring: List[Optional[Message]] = [None] * capacity
+        self.head = 0
+        self.cursors: Dict[str, int] = {}
+        self.published = 0
+        self.dropped = 0
+        self.missed = 0
+
+    def publish(self, msg: Message) -> bool:
+        if not self.cursors:
+            self.dropped += 1
+            return False
+        self._ring[self.head % self.capacity] = msg
+        self.head += 1
+        self.published += 1
+        return True
+
+    def poll(self, subscriber: str) -> List[Message]:
+        cursor = self.cursors[subscriber]
+        start = self.head - self.capacity
+        if cursor < start:
+            self.missed += start - cursor
+            cursor = start
+        ring, cap = self._ring, self.capacity
+        msgs = [ring[i % cap] for i in range(cursor, self.head)]
+        self.cursors[subscriber] = self.head
+        return msgs
+
+    def depth(self, subscriber: str) -> int:
+        return min(self.head - self.cursors[subscriber], self.capacity)
+
+
+class Channel:
+    """Caixa de entrada de um destinatário, com capacidade opcional.
+
+    Mensagens pendentes ficam em um ``OrderedDict``: mensagens com chave usam
+    ``(tipo, chave)`` (o que permite substituí-las sem mudar a ordem) e as
+    demais recebem um número sequencial.
+    """
+
+    __slots__ = (
+        "name",
+        "capacity",
+        "policy",
+        "pending",
+        "closed",
+        "sent",
+        "received",
+        "dropped",
+        "coalesced",
+        "reads",
+        "_reads_at_check",
+        "_seq",
+    )
+
+    def __init__(self, name: str, capacity: Optional[int] = None, policy=DROP_OLDEST):
+        if policy not in POLICIES:
+            raise ValueError(f"Política desconhecida: {policy}")
+        self.name = name
+        self.capacity = capacity
+        self.policy = policy
+        self.pending: OrderedDict = OrderedDict()
+        self.closed = False
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.reads = 0
+        self._reads_at_check = 0
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.pending)
+
+    def drain(self) -> List[dict]:
+        self.reads += 1
+        self.closed = False
+        msgs = [content for content, _ in self.pending.values()]
+        self.pending.clear()
+        self.received += len(msgs)
+        return msgs
 
 
 class MessageBus:
-    def __init__(self):
-        self.messages: Dict[str, List[dict]] = {}
+    def __init__(
+        self,
+        default_capacity: Optional[int] = None,
+        default_policy=DROP_OLDEST,
+        topic_capacity: int = 256,
+    ):
+        self.channels: Dict[str, Channel] = {}
         self.registered: set[str] = set()
+        self.default_capacity = default_capacity
+        self.default_policy = default_policy
+        self.topics: Dict[str, Topic] = {}
+        self.topic_capacity = topic_capacity
+        # chaves já enviadas por remetente/destinatário, para descartar repetidas
+        self._sent: Dict[tuple[str, str], set[tuple]] = {}
+        # chave → pares (remetente/destinatário, identidade) onde ela aparece
+        self._sent_by_key: Dict[Hashable, set[tuple]] = {}
+        self.duplicates = 0
 
     def register(self, agent_id: str):
-        if agent_id not in self.messages:
-            self.messages[agent_id] = []
+        if agent_id not in self.registered:
+            self._channel(agent_id)
             self.registered.add(agent_id)
+            self.subscribe(BROADCAST, agent_id)
+
+    def subscribe(self, topic: str, subscriber: str):
+        t = self.topics.get(topic)
+        if t is None:
+            t = self.topics[topic] = Topic(topic, self.topic_capacity)
+        t.cursors.setdefault(subscriber, t.head)
 
-    def send(self, recipient_id: str, content: dict):
-        if recipient_id == "broadcast":
-            for rid in self.registered:
-                self.messages[rid].append(content)
+    def unsubscribe(self, topic: str, subscriber: str):
+        t = self.topics.get(topic)
+        if t is not None:
+            t.cursors.pop(subscriber, None)
+
+    def publish(self, topic: str, content: dict) -> bool:
+        t = self.topics.get(topic)
+        if t is None:
+            t = self.topics[topic] = Topic(topic, self.topic_capacity)
+        return t.publish(content if isinstance(content, Message) else Message(content))
+
+    def poll(self, topic: str, subscriber: str) -> List[Message]:
+        t = self.topics.get(topic)
+        if t is None or subscriber not in t.cursors:
+            return []
+        return t.poll(subscriber)
+
+    def _channel(self, channel_id: str) -> Channel:
+        chan = self.channels.get(channel_id)
+        if chan is None:
+            chan = self.channels[channel_id] = Channel(
+                channel_id, self.default_capacity, self.default_policy
+            )
+        return chan
+
+    def configure(
+        self, channel_id: str, capacity: Optional[int] = None, policy=DROP_OLDEST
+    ) -> Channel:
+        chan = self._channel(channel_id)
+        if policy not in POLICIES:
+            raise ValueError(f"Política desconhecida: {policy}")
+        chan.capacity = capacity
+        chan.policy = policy
+        return chan
+
+    def send(
+        self,
+        recipient_id: str,
+        content: dict,
+        sender: Optional[str] = None,
+        key: Optional[Hashable] = None,
+    ) -> bool:
+        """Entrega ``content``; retorna False se a mensagem foi descartada.
+
+        Com ``key`` (por exemplo a posição de uma crença), a mensagem é
+        identificada por ``(content["type"], key)``: uma mensagem pendente com a
+        mesma identidade na caixa do destinatário é substituída em vez de
+        duplicada, e, se ``sender`` for informado, o mesmo remetente não reenvia
+        uma identidade que já entregou a esse destinatário.
+
+        ``"broadcast"`` publica no tópico de mesmo nome, assinado por todos os
+        agentes registrados.
+        """
+        ckey = None if key is None else (content.get("type"), key)
+        origin = None
+        if ckey is not None and sender is not None:
+            origin = (sender, recipient_id)
+            seen = self._sent.setdefault(origin, set())
+            if ckey in seen:
+                self.duplicates += 1
+                return False
+
+        if recipient_id == BROADCAST:
+            delivered = self.publish(BROADCAST, content)
         else:
-            if recipient_id not in self.messages:
-                self.register(recipient_id)
-            self.messages[recipient_id].append(content)
+            # destinatário desconhecido ganha um canal, mas não vira consumidor
+            # registrado: se ninguém ler, ``reap`` o fecha
+            delivered = self._deliver(
+                self._channel(recipient_id), content, ckey, origin
+            )
+
+        if delivered and origin is not None:
+            seen.add(ckey)
+            self._sent_by_key.setdefault(key, set()).add((origin, ckey))
+        return delivered
+
+    def forget(self, key: Hashable):
+        """Esquece os envios com ``key``, que pode voltar a ser enviada.
+
+        Para chamar quando o assunto da chave deixa de existir (a crença sobre
+        uma posição foi consumida); sem isso os conjuntos de deduplicação
+        crescem com tudo o que já foi enviado.
+        """
+        for origin, ckey in self._sent_by_key.pop(key, ()):
+            seen = self._sent.get(origin)
+            if seen is not None:
+                seen.discard(ckey)
+
+    def _deliver(self, chan: Channel, content, ckey, origin) -> bool:
+        chan.sent += 1
+        if chan.closed:
+            chan.dropped += 1
+            return False
+        pending = chan.pending
+        if ckey is not None and ckey in pending:
+            pending[ckey] = (content, origin)
+            chan.coalesced += 1
+            return True
+        if ckey is None:
+            ckey = chan._seq
+            chan._seq += 1
+
+        if chan.policy == LATEST_ONLY:
+            self._evict(chan, len(pending))
+        elif chan.capacity is not None and len(pending) >= chan.capacity:
+            if chan.policy == DROP_NEWEST:
+                chan.dropped += 1
+                return False
+            self._evict(chan, len(pending) - chan.capacity + 1)
+        pending[ckey] = (content, origin)
+        return True
+
+    def _evict(self, chan: Channel, count: int):
+        for _ in range(count):
+            ckey, (_, origin) = chan.pending.popitem(last=False)
+            chan.dropped += 1
+            if origin is not None:
+                # a mensagem descartada pode voltar a ser enviada pelo remetente
+                self._sent[origin].discard(ckey)
 
     def receive(self, recipient_id: str):
-        inbox = self.messages.get(recipient_id, [])
-        self.messages[recipient_id] = []
-        return inbox
+        msgs = self._channel(recipient_id).drain()
+        if recipient_id in self.registered:
+            msgs.extend(self.poll(BROADCAST, recipient_id))
+        return msgs
+
+    def depth(self, channel_id: str) -> int:
+        chan = self.channels.get(channel_id)
+        return len(chan) if chan else 0
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "depth": len(c),
+                "sent": c.sent,
+                "received": c.received,
+                "dropped": c.dropped,
+                "coalesced": c.coalesced,
+                "reads": c.reads,
+                "closed": c.closed,
+            }
+            for name, c in self.channels.items()
+        }
+
+    def topic_stats(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "subscribers": len(t.cursors),
+                "published": t.published,
+                "dropped": t.dropped,
+                "missed": t.missed,
+                "max_lag": max((t.depth(s) for s in t.cursors), default=0),
+            }
+            for name, t in self.topics.items()
+        }
+
+    def dead_channels(self) -> List[str]:
+        """Canais não registrados com mensagens não lidas desde a última checagem.
+
+        Canais de quem chamou ``register`` nunca entram: um agente ocupado pode
+        passar vários passos sem ler a caixa de entrada.
+        """
+        registered = self.registered
+        return [
+            name
+            for name, c in self.channels.items()
+            if name not in registered
+            and not c.closed
+            and c.pending
+            and c.reads == c._reads_at_check
+        ]
+
+    def reap(self) -> List[str]:
+        """Fecha os canais sem consumidor (``dead_channels``) e libera suas mensagens.
+
+        Envios para um canal fechado são contados em ``dropped`` e descartados;
+        o canal reabre na próxima chamada de ``receive``.
+        """
+        dead = self.dead_channels()
+        for name in dead:
+            chan = self.channels[name]
+            self._evict(chan, len(chan.pending))
+            chan.closed = True
+        for chan in self.channels.values():
+            chan._reads_at_check = chan.reads
+        return dead
@@ -1,3 +1,4 @@
+from instrumentation.events import INFO
 from .terrain import Position
 
 
@@ -10,16 +11,26 @@ class Base:
     def deposit(self, resource_type, agent_id=None):
         if resource_type.name in self.storage:
             self.model.total_resources -= 1
-            print(f"Recursos restantes: {self.model.total_resources}")
             self.storage[resource_type.name] += 1
 
         if agent_id is not None and agent_id in self.model.agents_log:
             self.model.agents_log[agent_id][resource_type] += 1
 
-        total = self.get_total_utility()
-        print(
-            f"[BASE] Recebeu {resource_type.name}  (+{resource_type.value})  → Total={total}"
-        )
+        events = self.model.events
+        if INFO >= events.level:
+            events.emit(
+                INFO,
+                "BASE",
+                None,
+                self.model.schedule.time,
+                "Recebeu %s  (+%d)  → Total=%d | Recursos restantes: %d",
+                (
+                    resource_type.name,
+                    resource_type.value,
+                    self.get_total_utility(),
+                    self.model.total_resources,
+                ),
+            )
 
     def get_total_utility(self):
         return (
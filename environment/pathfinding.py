@@ -0,0 +1,268 @@
+import heapq
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .terrain import Terrain
+
+Cell = Tuple[int, int]
+
+_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class Pathfinder:
+    """A* sobre o ``Terrain``, com cache de caminhos por (origem, destino).
+
+    Cada caminho calculado é guardado como uma tabela de próximo passo
+    ``(célula, destino) → célula``, então quem segue o caminho um passo por
+    vez encontra o resto dele no cache.
+
+    Quando o A* esgota a busca sem chegar ao destino, as células visitadas
+    formam a componente conexa da origem: elas passam a apontar para a origem
+    como representante e o par (representante, destino) fica marcado como
+    inalcançável, então qualquer outra origem da mesma componente desiste em
+    O(1). Os dois caches são descartados quando os obstáculos do terreno
+    mudam (``Terrain.version``).
+    """
+
+    def __init__(self, terrain: Terrain, max_entries: int = 500_000):
+        self.terrain = terrain
+        self.max_entries = max_entries
+        self._hops: Dict[Tuple[Cell, Cell], Cell] = {}
+        self._component: Dict[Cell, Cell] = {}
+        self._unreachable: set[Tuple[Cell, Cell]] = set()
+        self._version = terrain.version
+        self.hits = 0
+        self.misses = 0
+
+    def _validate(self):
+        if self._version != self.terrain.version:
+            self._hops.clear()
+            self._component.clear()
+            self._unreachable.clear()
+            self._version = self.terrain.version
+
+    def _known_unreachable(self, start: Cell, goal: Cell) -> bool:
+        k = self._component.get(start)
+        if k is not None and (k, goal) in self._unreachable:
+            self.hits += 1
+            return True
+        return False
+
+    def _mark_unreachable(self, came, start: Cell, goal: Cell):
+        component = self._component
+        k = component.get(start)
+        if k is None:
+            if len(component) + len(came) > self.max_entries:
+                component.clear()
+                self._unreachable.clear()
+            k = start
+            for cell in came:
+                component[cell] = k
+        self._unreachable.add((k, goal))
+
+    def next_step(self, start: Cell, goal: Cell) -> Optional[Cell]:
+        """Próxima célula rumo a ``goal``; ``None`` se o destino é inalcançável."""
+        if start == goal:
+            return start
+        self._validate()
+        nxt = self._hops.get((start, goal))
+        if nxt is not None:
+            self.hits += 1
+            return nxt
+        if self._known_unreachable(start, goal):
+            return None
+        path = self.astar(start, goal)
+        return path[0] if path else None
+
+    def path(self, start: Cell, goal: Cell) -> List[Cell]:
+        """Caminho de ``start`` (exclusive) até ``goal``; vazio se inalcançável."""
+        if start == goal:
+            return []
+        self._validate()
+        hops = self._hops
+        if (start, goal) not in hops:
+            if self._known_unreachable(start, goal):
+                return []
+            return self.astar(start, goal) or []
+        self.hits += 1
+        path, cur = [], start
+        try:
+            while cur != goal:
+                cur = hops[(cur, goal)]
+                path.append(cur)
+        except KeyError:  # cache esvaziado por outra thread no meio da leitura
+            return self.astar(start, goal) or []
+        return path
+
+    def distances(self, start: Cell, goals) -> Dict[Cell, int]:
+        """Distância a pé de ``start`` até cada célula de ``goals``, por BFS.
+
+        A busca para quando todos os destinos foram alcançados; os que não
+        têm caminho ficam de fora do resultado.
+        """
+        terrain = self.terrain
+        left = set(goals)
+        found: Dict[Cell, int] = {}
+        if start in left:
+            found[start] = 0
+            left.discard(start)
+        seen = {start}
+        frontier = [start]
+        d = 0
+        while frontier and left:
+            d += 1
+            nxt = []
+            for x, y in frontier:
+                for dx, dy in _STEPS:
+                    nb = (x + dx, y + dy)
+                    if nb in seen or not terrain.is_free(*nb):
+                        continue
+                    seen.add(nb)
+                    nxt.append(nb)
+                    if nb in left:
+                        found[nb] = d
+                        left.discard(nb)
+            frontier = nxt
+        return found
+
+    def astar(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        self.misses += 1
+        terrain = self.terrain
+        if not terrain.is_free(*goal):
+            return None
+        gx, gy = goal
+        came: Dict[Cell, Optional[Cell]] = {start: None}
+        cost = {start: 0}
+        h0 = abs(start[0] - gx) + abs(start[1] - gy)
+        # desempate por h: entre nós de mesmo f, expande o mais próximo do destino
+        frontier = [(h0, h0, start)]
+        while frontier:
+            _, _, cur = heapq.heappop(frontier)
+            if cur == goal:
+                break
+            g = cost[cur] + 1
+            x, y = cur
+            for dx, dy in _STEPS:
+                nb = (x + dx, y + dy)
+                if g >= cost.get(nb, g + 1) or not terrain.is_free(*nb):
+                    continue
+                cost[nb] = g
+                came[nb] = cur
+                h = abs(nb[0] - gx) + abs(nb[1] - gy)
+                heapq.heappush(frontier, (g + h, h, nb))
+        else:
+            self._mark_unreachable(came, start, goal)
+            return None
+
+        path = []
+        cur = goal
+        while cur != start:
+            path.append(cur)
+            cur = came[cur]
+        path.reverse()
+
+        if len(self._hops) + len(path) > self.max_entries:
+            self._hops.clear()
+        prev = start
+        for cell in path:
+            self._hops[(prev, goal)] = cell
+            prev = cell
+        return path
+
+
+class DistanceField:
+    """Campo de distâncias até um alvo fixo, calculado com um único BFS.
+
+    Guarda, para cada célula, a distância até ``target`` e a célula vizinha
+    que leva até ele, então o próximo passo de qualquer agente é uma consulta
+    O(1). O campo é recalculado só quando o terreno muda.
+    """
+
+    def __init__(self, terrain: Terrain, target: Cell):
+        self.terrain = terrain
+        self.target = target
+        self._version = None
+        self.builds = 0
+
+    def __getstate__(self):
+        # o campo é refeito do terreno na primeira consulta após restaurar
+        state = self.__dict__.copy()
+        state.pop("_dist", None)
+        state.pop("_next", None)
+        state["_version"] = None
+        return state
+
+    def _validate(self):
+        if self._version != self.terrain.version:
+            self._build()
+
+    def _build(self):
+        terrain = self.terrain
+        w, h = terrain.width, terrain.height
+        dist = array("i", [-1]) * (w * h)
+        nxt = array("i", [-1]) * (w * h)
+        tx, ty = self.target
+        if terrain.is_free(tx, ty):
+            # obstáculos marcados com distância -2 para o BFS só olhar índices
+            for ox, oy in terrain.obstacles:
+                dist[ox * h + oy] = -2
+            start = tx * h + ty
+            dist[start] = 0
+            nxt[start] = start
+            queue = deque([start])
+            pop, push = queue.popleft, queue.append
+            last = w * h - h
+            while queue:
+                i = pop()
+                d = dist[i] + 1
+                y = i % h
+                for j in (
+                    i - h if i >= h else -1,
+                    i + h if i < last else -1,
+                    i - 1 if y > 0 else -1,
+                    i + 1 if y < h - 1 else -1,
+                ):
+                    if j >= 0 and dist[j] == -1:
+                        dist[j] = d
+                        nxt[j] = i
+                        push(j)
+            for ox, oy in terrain.obstacles:
+                dist[ox * h + oy] = -1
+        self._dist = dist
+        self._next = nxt
+        self._version = terrain.version
+        self.builds += 1
+
+    def distance(self, pos: Cell) -> Optional[int]:
+        self._validate()
+        d = self._dist[pos[0] * self.terrain.height + pos[1]]
+        return None if d < 0 else d
+
+    def distances(self, xs, ys) -> np.ndarray:
+        """``distance`` das células ``(xs[i], ys[i])``, com -1 onde não há caminho."""
+        self._validate()
+        dist = np.frombuffer(self._dist, dtype=np.int32)
+        return dist[np.asarray(xs) * self.terrain.height + np.asarray(ys)]
+
+    def next_step(self, pos: Cell) -> Optional[Cell]:
+        """Vizinho de ``pos`` mais próximo do alvo; ``None`` se inalcançável."""
+        self._validate()
+        h = self.terrain.height
+        j = self._next[pos[0] * h + pos[1]]
+        return None if j < 0 else divmod(j, h)
+
+    def path(self, pos: Cell) -> List[Cell]:
+        self._validate()
+        h = self.terrain.height
+        nxt = self._next
+        i = pos[0] * h + pos[1]
+        if nxt[i] < 0:
+            return []
+        path = []
+        while self._dist[i] > 0:
+            i = nxt[i]
+            path.append(divmod(i, h))
+        return path
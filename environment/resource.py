@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict
@@ -10,6 +11,34 @@ class ResourceType(Enum):
     STRUCTURE = 50
 
 
+_SLOT = {rt: rt.name.lower() for rt in ResourceType}
+
+
+class Tally(Mapping):
+    """Contagem por ``ResourceType`` em slots fixos, lida e escrita como um dict."""
+
+    __slots__ = tuple(_SLOT.values())
+
+    def __init__(self, counts=None):
+        for rt, name in _SLOT.items():
+            setattr(self, name, counts[rt] if counts else 0)
+
+    def __getitem__(self, rt: ResourceType) -> int:
+        return getattr(self, _SLOT[rt])
+
+    def __setitem__(self, rt: ResourceType, n: int):
+        setattr(self, _SLOT[rt], n)
+
+    def __iter__(self):
+        return iter(ResourceType)
+
+    def __len__(self) -> int:
+        return len(_SLOT)
+
+    def __repr__(self):
+        return f"Tally({ {rt.name: n for rt, n in self.items()} })"
+
+
 @dataclass
 class Resource:
     resource_type: ResourceType
@@ -13,12 +13,27 @@ class Terrain:
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
-        self.grid = [[None for _ in range(width)] for _ in range(height)]
+        self.grid = [[None] * width for _ in range(height)]
         self.obstacles: Set[Tuple[int, int]] = set()
+        self.version = 0
 
     def add_obstacle(self, x: int, y: int):
         if 0 <= x < self.width and 0 <= y < self.height:
             self.obstacles.add((x, y))
+            self.version += 1
+
+    def add_obstacles(self, cells):
+        """Adiciona vários obstáculos com uma só mudança de ``version``."""
+        w, h = self.width, self.height
+        before = len(self.obstacles)
+        self.obstacles.update((x, y) for x, y in cells if 0 <= x < w and 0 <= y < h)
+        if len(self.obstacles) != before:
+            self.version += 1
+
+    def remove_obstacle(self, x: int, y: int):
+        if (x, y) in self.obstacles:
+            self.obstacles.discard((x, y))
+            self.version += 1
 
     def is_free(self, x: int, y: int) -> bool:
         return (
@@ -27,14 +42,14 @@ class Terrain:
             and (x, y) not in self.obstacles
         )
 
-    def get_random_adjacent_position(self, pos: Position) -> Position:
+    def get_random_adjacent_position(self, pos: Position, rng=random) -> Position:
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         valid = [
             Position(pos.x + dx, pos.y + dy)
             for dx, dy in directions
             if self.is_free(pos.x + dx, pos.y + dy)
         ]
-        return random.choice(valid) if valid else pos
+        return rng.choice(valid) if valid else pos
 
 
 def safe_move(grid, agent, new_pos, obstacles):
@@ -0,0 +1,102 @@
+import json
+import sys
+import threading
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "OFF": OFF}
+_NAMES = {v: k for k, v in LEVELS.items()}
+
+
+def parse_level(level) -> int:
+    if isinstance(level, int):
+        return level
+    try:
+        return LEVELS[level.upper()]
+    except KeyError:
+        raise ValueError(f"Nível de log desconhecido: {level}") from None
+
+
+class EventLogger:
+    """Logger de eventos da simulação, compartilhado por modelo e agentes.
+
+    As mensagens usam formatação ``%`` preguiçosa: quem chama deve checar
+    ``level`` antes de ``emit`` (os helpers ``log`` dos agentes já fazem
+    isso), de modo que nenhuma string é montada quando o nível está
+    desligado. O sink JSONL é opcional e grava em lotes de ``buffer_size``.
+    """
+
+    def __init__(
+        self, level=INFO, echo=True, stream=None, jsonl_path=None, buffer_size=4096
+    ):
+        self.level = parse_level(level)
+        self.echo = echo
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._buffer: list[str] = []
+        # agentes podem emitir de várias threads na fase perceive
+        self._lock = threading.Lock()
+        self.jsonl_path = jsonl_path
+        self._jsonl = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+
+    def __getstate__(self):
+        # o que está no buffer fica com o original; a cópia reabre o JSONL em
+        # modo append e ecoa em sys.stdout
+        state = self.__dict__.copy()
+        state["_buffer"] = []
+        state["stream"] = None
+        del state["_lock"], state["_jsonl"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        path = self.jsonl_path
+        self._jsonl = open(path, "a", encoding="utf-8") if path else None
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    def emit(self, level, source, agent_id, step, msg, args=()):
+        if args:
+            msg = msg % args
+        if self.echo:
+            out = self.stream or sys.stdout
+            if agent_id is None:
+                out.write(f"[{source} | t={step:03}] {msg}\n")
+            else:
+                out.write(f"[{source} {agent_id:02} | t={step:03}] {msg}\n")
+        if self._jsonl is not None:
+            line = json.dumps(
+                {
+                    "t": step,
+                    "level": _NAMES.get(level, level),
+                    "source": source,
+                    "agent": agent_id,
+                    "msg": msg,
+                },
+                ensure_ascii=False,
+            )
+            with self._lock:
+                self._buffer.append(line)
+                full = len(self._buffer) >= self.buffer_size
+            if full:
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._jsonl is not None and self._buffer:
+                self._jsonl.write("\n".join(self._buffer) + "\n")
+                self._buffer.clear()
+                self._jsonl.flush()
+        if self.echo:
+            (self.stream or sys.stdout).flush()
+
+    def close(self):
+        self.flush()
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
@@ -0,0 +1,256 @@
+"""Perfil de tempo por classe de agente e por fase, sem profiler externo.
+
+``StepProfiler(model).enable()`` troca, nas classes, ``step`` e os métodos
+listados em ``PHASES`` por versões cronometradas, e conta as consultas ao
+grid e as mensagens do ``MessageBus`` do modelo. ``disable()`` restaura os
+métodos originais quando nenhum outro profiler estiver ligado, então um
+modelo sem profiler ativo não paga nada.
+"""
+
+import threading
+from collections import Counter
+from functools import wraps
+from time import perf_counter
+
+# métodos cronometrados por classe, além de step (nomes, para não importar agents)
+PHASES = {
+    "ResourceModel": (),
+    "GoalBasedAgent": (
+        "perceive",
+        "act",
+        "_sync_beliefs",
+        "_receive_tasks",
+        "_deliberate",
+        "_follow_path",
+        "_report_sightings",
+    ),
+    "StateBasedAgent": (
+        "perceive",
+        "act",
+        "_receive_tasks",
+        "_look_around",
+        "_execute_task",
+        "_check_partners",
+        "_return_to_base",
+        "_explore",
+    ),
+    "CooperativeAgent": (
+        "perceive",
+        "act",
+        "_receive_tasks",
+        "_task_target",
+        "_best",
+        "_collect_here",
+        "_check_partnership",
+        "_go_to_base",
+    ),
+    "ReactiveAgent": ("_collect_here", "_go_to_base", "_random_walk"),
+    "BDIAgent": ("_receive_beliefs", "_allocate", "_delegate"),
+}
+GRID_QUERIES = (
+    "resources_at",
+    "resource_arrays",
+    "get_cell_list_contents",
+    "get_neighborhood",
+)
+BUS_CALLS = ("send", "publish", "receive", "poll")
+# métodos que definem a quem se atribuem os contadores
+_SCOPES = ("step", "perceive", "act")
+
+_installed: dict[tuple[type, str], object] = {}
+_active = 0
+
+
+class Timing:
+    """Chamadas, tempo total e máximo, e um histograma em potências de 2 de µs."""
+
+    __slots__ = ("calls", "total", "max", "hist")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.hist = [0] * 32
+
+    def add(self, dt: float):
+        self.calls += 1
+        self.total += dt
+        if dt > self.max:
+            self.max = dt
+        self.hist[min(int(dt * 1e6).bit_length(), 31)] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "total_s": self.total,
+            "mean_us": self.total / self.calls * 1e6 if self.calls else 0.0,
+            "max_us": self.max * 1e6,
+            # bucket "≤N µs" → chamadas
+            "hist": {f"<={1 << b}us": n for b, n in enumerate(self.hist) if n},
+        }
+
+
+def _timed(fn, key, get_profiler, scope):
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        prof = get_profiler(self)
+        if prof is None or not prof.enabled:
+            return fn(self, *args, **kwargs)
+        local = prof._local
+        prev = getattr(local, "scope", "model")
+        if scope:
+            local.scope = key.partition(".")[0]
+        t0 = perf_counter()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            prof.record(key, perf_counter() - t0)
+            local.scope = prev
+
+    return wrapper
+
+
+def _profiler_of_agent(agent):
+    return getattr(agent.model, "profiler", None)
+
+
+def _profiler_of_model(model):
+    return getattr(model, "profiler", None)
+
+
+def _profiled_class(cls):
+    """Classe da hierarquia de ``cls`` que tem fases em ``PHASES``."""
+    return next((c for c in cls.__mro__ if c.__name__ in PHASES), None)
+
+
+def _install(classes):
+    for cls in classes:
+        get = (
+            _profiler_of_model
+            if cls.__name__ == "ResourceModel"
+            else _profiler_of_agent
+        )
+        for name in ("step",) + PHASES.get(cls.__name__, ()):
+            fn = getattr(cls, name, None)
+            if fn is None or (cls, name) in _installed:
+                continue
+            _installed[(cls, name)] = cls.__dict__.get(name)
+            key = f"{cls.__name__}.{name}"
+            setattr(cls, name, _timed(fn, key, get, name in _SCOPES))
+
+
+def _uninstall():
+    for (cls, name), original in _installed.items():
+        if original is None:
+            delattr(cls, name)
+        else:
+            setattr(cls, name, original)
+    _installed.clear()
+
+
+class StepProfiler:
+    def __init__(self, model):
+        self.model = model
+        self.enabled = False
+        self.timings: dict[str, Timing] = {}
+        # (classe do agente em execução ou "model", operação) → chamadas
+        self.counters: Counter = Counter()
+        self._local = threading.local()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def enable(self):
+        global _active
+        if self.enabled:
+            return self
+        objs = [self.model, *self.model.schedule.agents]
+        _install({c for c in map(_profiled_class, map(type, objs)) if c is not None})
+        self._wrap_instances()
+        self.enabled = True
+        _active += 1
+        return self
+
+    def disable(self):
+        global _active
+        if not self.enabled:
+            return self
+        self.enabled = False
+        self._unwrap_instances()
+        _active -= 1
+        if _active == 0:
+            _uninstall()
+        return self
+
+    def reset(self):
+        self.timings.clear()
+        self.counters.clear()
+
+    def record(self, key: str, dt: float):
+        t = self.timings.get(key)
+        if t is None:
+            t = self.timings[key] = Timing()
+        t.add(dt)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[(getattr(self._local, "scope", "model"), name)] += n
+
+    def _wrap_instances(self):
+        grid, bus = self.model.grid, self.model.message_bus
+        for name in GRID_QUERIES:
+            setattr(grid, name, self._counting(getattr(grid, name), f"grid.{name}"))
+        for name in BUS_CALLS:
+            fn = getattr(bus, name)
+            if name in ("receive", "poll"):
+                setattr(bus, name, self._counting_results(fn, f"bus.{name}"))
+            else:
+                setattr(bus, name, self._counting(fn, f"bus.{name}"))
+
+    def _unwrap_instances(self):
+        for obj, names in (
+            (self.model.grid, GRID_QUERIES),
+            (self.model.message_bus, BUS_CALLS),
+        ):
+            for name in names:
+                obj.__dict__.pop(name, None)
+
+    def _counting(self, fn, name):
+        def wrapper(*args, **kwargs):
+            self.count(name)
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    def _counting_results(self, fn, name):
+        def wrapper(*args, **kwargs):
+            msgs = fn(*args, **kwargs)
+            self.count(name)
+            if msgs:
+                self.count(f"{name}.messages", len(msgs))
+            return msgs
+
+        return wrapper
+
+    def report(self) -> dict:
+        counters: dict[str, dict] = {}
+        for (scope, name), n in sorted(self.counters.items()):
+            counters.setdefault(scope, {})[name] = n
+        return {
+            "timings": {k: t.as_dict() for k, t in sorted(self.timings.items())},
+            "counters": counters,
+        }
+
+    def summary(self) -> str:
+        """Tabela de tempos, do mais caro ao mais barato."""
+        rows = sorted(self.timings.items(), key=lambda kv: -kv[1].total)
+        lines = [f"{'método':<36} {'chamadas':>9} {'total s':>9} {'média µs':>9}"]
+        for key, t in rows:
+            mean = t.total / t.calls * 1e6 if t.calls else 0.0
+            lines.append(f"{key:<36} {t.calls:9d} {t.total:9.3f} {mean:9.1f}")
+        return "\n".join(lines)
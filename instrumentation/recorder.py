@@ -0,0 +1,233 @@
+"""Séries temporais do modelo e dos agentes em colunas tipadas.
+
+``TimeSeriesRecorder`` guarda cada métrica em um array NumPy pré-alocado de
+``chunk_rows`` linhas. Quando o bloco enche ele é gravado em disco (um arquivo
+``.npz`` por bloco, ou Parquet se ``pyarrow`` estiver instalado) e o buffer é
+reaproveitado, então a memória não cresce com o número de passos. Se uma
+execução anterior deixou blocos em ``path``, a criação falha com
+``FileExistsError``; com ``overwrite=True`` eles são apagados. Sem
+``path``, os primeiros ``memory_chunks`` blocos ficam na memória; passando
+disso, todos vão para um diretório temporário, apagado junto com o gravador.
+
+Duas tabelas são gravadas:
+
+- ``model``: uma linha por amostra (utilidade, armazenamento por tipo,
+  recursos restantes);
+- ``agents``: uma linha por agente coletor e amostra (entregas por tipo,
+  recurso carregado, espera por parceiro, mensagens na caixa de entrada).
+"""
+
+import glob
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+from environment.resource import ResourceType
+
+MODEL_COLUMNS = {
+    "step": np.int32,
+    "utility": np.int64,
+    "crystal": np.int32,
+    "metal": np.int32,
+    "structure": np.int32,
+    "remaining": np.int32,
+}
+AGENT_COLUMNS = {
+    "step": np.int32,
+    "agent": np.int32,
+    "crystal": np.int32,
+    "metal": np.int32,
+    "structure": np.int32,
+    # ResourceType.value do recurso carregado, 0 se nenhum
+    "carrying": np.int8,
+    "waiting": np.bool_,
+    "inbox": np.int32,
+}
+FORMATS = ("npz", "parquet")
+
+
+class _Table:
+    def __init__(
+        self, name: str, columns: dict, rows: int, path, fmt: str, memory_chunks: int
+    ):
+        self.name = name
+        self.path = path
+        self.fmt = fmt
+        self.buffers = {c: np.empty(rows, dtype=t) for c, t in columns.items()}
+        self.capacity = rows
+        self.size = 0
+        self.chunks = 0
+        self.memory: list[dict] = []
+        self.memory_chunks = memory_chunks
+
+    def extend(self, cols: dict):
+        n = len(next(iter(cols.values())))
+        done = 0
+        while done < n:
+            take = min(n - done, self.capacity - self.size)
+            for c, buf in self.buffers.items():
+                buf[self.size : self.size + take] = cols[c][done : done + take]
+            self.size += take
+            done += take
+            if self.size == self.capacity:
+                self.flush()
+
+    def flush(self):
+        if not self.size:
+            return
+        chunk = {c: buf[: self.size] for c, buf in self.buffers.items()}
+        if self.path is None:
+            self.memory.append({c: a.copy() for c, a in chunk.items()})
+            if len(self.memory) > self.memory_chunks:
+                self._spill()
+        else:
+            _write(
+                os.path.join(self.path, f"{self.name}-{self.chunks:06d}"),
+                chunk,
+                self.fmt,
+            )
+        self.chunks += 1
+        self.size = 0
+
+    def _spill(self):
+        """Passa os blocos da memória para um diretório temporário próprio."""
+        self.path = tempfile.mkdtemp(prefix=f"series-{self.name}-")
+        weakref.finalize(self, shutil.rmtree, self.path, ignore_errors=True)
+        for i, chunk in enumerate(self.memory):
+            _write(os.path.join(self.path, f"{self.name}-{i:06d}"), chunk, self.fmt)
+        self.memory = []
+
+    def series(self) -> dict:
+        parts = list(self.memory)
+        if self.path is not None:
+            parts = _read_chunks(self.path, self.name)
+        if self.size:
+            parts.append(
+                {c: buf[: self.size].copy() for c, buf in self.buffers.items()}
+            )
+        if not parts:
+            return {c: buf[:0].copy() for c, buf in self.buffers.items()}
+        return {c: np.concatenate([p[c] for p in parts]) for c in self.buffers}
+
+
+def _write(stem: str, chunk: dict, fmt: str):
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.table(chunk), stem + ".parquet")
+    else:
+        np.savez(stem + ".npz", **chunk)
+
+
+def _chunk_files(path: str, name: str) -> list[str]:
+    return sorted(
+        f
+        for f in glob.glob(os.path.join(path, f"{name}-*.*"))
+        if f.endswith((".npz", ".parquet"))
+    )
+
+
+def _read_chunks(path: str, name: str) -> list[dict]:
+    parts = []
+    for file in _chunk_files(path, name):
+        if file.endswith(".npz"):
+            with np.load(file) as data:
+                parts.append({c: data[c] for c in data.files})
+        elif file.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(file)
+            parts.append({c: table[c].to_numpy() for c in table.column_names})
+    return parts
+
+
+def load(path: str, name: str = "model") -> dict:
+    """Lê de ``path`` todos os blocos da tabela ``name`` (``model`` ou ``agents``)."""
+    parts = _read_chunks(path, name)
+    if not parts:
+        return {}
+    return {c: np.concatenate([p[c] for p in parts]) for c in parts[0]}
+
+
+class TimeSeriesRecorder:
+    def __init__(
+        self,
+        model,
+        interval: int = 1,
+        chunk_rows: int = 65_536,
+        path: str | None = None,
+        fmt: str = "npz",
+        memory_chunks: int = 16,
+        overwrite: bool = False,
+    ):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato desconhecido: {fmt}")
+        if fmt == "parquet":
+            import pyarrow  # noqa: F401  (falha já na criação, não no primeiro bloco)
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            old = _chunk_files(path, "model") + _chunk_files(path, "agents")
+            if old and not overwrite:
+                raise FileExistsError(
+                    f"{path} já tem {len(old)} blocos de outra execução "
+                    f"(ex.: {os.path.basename(old[0])}); use overwrite=True"
+                )
+            for file in old:
+                os.remove(file)
+        self.model = model
+        self.interval = interval
+        self.model_table = _Table(
+            "model", MODEL_COLUMNS, chunk_rows, path, fmt, memory_chunks
+        )
+        self.agent_table = _Table(
+            "agents", AGENT_COLUMNS, chunk_rows, path, fmt, memory_chunks
+        )
+
+    def collect(self):
+        """Amostra o estado atual se o passo cair no intervalo de amostragem."""
+        model = self.model
+        t = model.schedule.time
+        if t % self.interval:
+            return
+        storage = model.base.storage
+        self.model_table.extend(
+            {
+                "step": (t,),
+                "utility": (model.base.get_total_utility(),),
+                "crystal": (storage["CRYSTAL"],),
+                "metal": (storage["METAL"],),
+                "structure": (storage["STRUCTURE"],),
+                "remaining": (model.total_resources,),
+            }
+        )
+
+        agents = [a for a in model.schedule.agents if hasattr(a, "delivered")]
+        if not agents:
+            return
+        bus = model.message_bus
+        self.agent_table.extend(
+            {
+                "step": np.full(len(agents), t),
+                "agent": [a.unique_id for a in agents],
+                "crystal": [a.delivered[ResourceType.CRYSTAL] for a in agents],
+                "metal": [a.delivered[ResourceType.METAL] for a in agents],
+                "structure": [a.delivered[ResourceType.STRUCTURE] for a in agents],
+                "carrying": [a.carrying.value if a.carrying else 0 for a in agents],
+                "waiting": [getattr(a, "waiting_for_help", False) for a in agents],
+                "inbox": [bus.depth(str(a.unique_id)) for a in agents],
+            }
+        )
+
+    def flush(self):
+        self.model_table.flush()
+        self.agent_table.flush()
+
+    def model_series(self) -> dict:
+        return self.model_table.series()
+
+    def agent_series(self) -> dict:
+        return self.agent_table.series()
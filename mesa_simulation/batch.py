@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from statistics import mean
+
+from environment.resource import ResourceType
+from instrumentation.events import EventLogger
+from mesa_simulation import checkpoint
+from mesa_simulation.model import ResourceModel
+from mesa_simulation.scenario import resolve
+
+MODEL_KEYS = ("width", "height", "agent_configs", "resources", "obstacles")
+OPTIONAL_KEYS = (
+    "inbox_capacity",
+    "reap_interval",
+    "batch_coop_scoring",
+    "allocation_interval",
+    "scheduler",
+    "perceive_workers",
+    "profile",
+)
+
+
+def load_config(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _seeds(config: dict) -> list[int]:
+    seeds = config.get("seeds", [0])
+    if isinstance(seeds, dict):
+        start = seeds.get("start", 0)
+        return list(range(start, start + seeds["count"]))
+    return list(seeds)
+
+
+def expand_runs(config: dict) -> list[dict]:
+    """Cruza cada variante com cada seed, gerando uma especificação por execução.
+
+    Chaves do topo do arquivo (``width``, ``agent_configs``...) valem como
+    padrão e cada item de ``variants`` pode sobrescrevê-las. Com
+    ``scenario`` (arquivo de ``mesa_simulation.scenario``), o mundo vem do
+    arquivo, carregado só na hora de rodar.
+    """
+    keys = MODEL_KEYS + OPTIONAL_KEYS + ("scenario",)
+    defaults = {k: config[k] for k in keys if k in config}
+    variants = config.get("variants") or [{"name": "default"}]
+    runs = []
+    for i, variant in enumerate(variants):
+        params = {**defaults, **{k: variant[k] for k in keys if k in variant}}
+        if "scenario" not in params:
+            params.setdefault("obstacles", [])
+        missing = [k for k in MODEL_KEYS if k not in params]
+        if missing and "scenario" not in params:
+            raise ValueError(f"Variante {i} sem os campos: {', '.join(missing)}")
+        for seed in _seeds(config):
+            runs.append(
+                {
+                    "variant": variant.get("name", f"variant-{i}"),
+                    "seed": seed,
+                    "max_steps": variant.get("max_steps", config.get("max_steps")),
+                    "params": params,
+                }
+            )
+    return runs
+
+
+def _build(spec: dict):
+    seed = spec["seed"]
+    events_dir = spec.get("events_dir")
+    events = EventLogger(
+        level=spec.get("log_level") or ("INFO" if events_dir else "OFF"),
+        echo=False,
+        jsonl_path=(
+            os.path.join(events_dir, f"{spec['variant']}-{seed}.jsonl")
+            if events_dir
+            else None
+        ),
+    )
+    model = ResourceModel(**resolve(spec["params"]), events=events, seed=seed)
+    if spec.get("max_steps") is not None:
+        model.max_steps = spec["max_steps"]
+    return model
+
+
+def run_one(spec: dict) -> dict:
+    seed = spec["seed"]
+    ckpt_dir, every = spec.get("checkpoint_dir"), spec.get("checkpoint_every")
+    ckpt = (
+        os.path.join(ckpt_dir, f"{spec['variant']}-{seed}.ckpt") if ckpt_dir else None
+    )
+    if ckpt and os.path.exists(ckpt):
+        # retoma uma execução interrompida do último snapshot
+        model = checkpoint.load(ckpt)
+    else:
+        model = _build(spec)
+    depleted_at = None
+    while model.running:
+        model.step()
+        if model.depleted():
+            depleted_at = model.schedule.time
+            break
+        if ckpt and every and model.schedule.time % every == 0:
+            checkpoint.save(model, ckpt)
+    if hasattr(model.schedule, "close"):
+        model.schedule.close()
+    model.events.close()
+    if ckpt and os.path.exists(ckpt):
+        os.remove(ckpt)
+
+    result = {
+        "variant": spec["variant"],
+        "seed": seed,
+        "steps": model.schedule.time,
+        "utility": model.base.get_total_utility(),
+        "depleted_at": depleted_at,
+        "delivered": {
+            getattr(a, "name", str(a.unique_id)): {
+                rt.name: a.delivered[rt] for rt in ResourceType
+            }
+            for a in model.schedule.agents
+            if hasattr(a, "delivered")
+        },
+    }
+    if model.profiler.enabled:
+        result["profile"] = model.profiler.report()
+        model.profiler.disable()
+    return result
+
+
+def run_sweep(
+    config: dict,
+    workers: int | None = None,
+    log_level: str | None = None,
+    events_dir: str | None = None,
+    checkpoint_dir: str | None = None,
+    checkpoint_every: int | None = None,
+) -> list[dict]:
+    runs = expand_runs(config)
+    for path in (events_dir, checkpoint_dir):
+        if path:
+            os.makedirs(path, exist_ok=True)
+    for spec in runs:
+        spec["log_level"] = log_level
+        spec["events_dir"] = events_dir
+        spec["checkpoint_dir"] = checkpoint_dir
+        spec["checkpoint_every"] = checkpoint_every
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_one(spec) for spec in runs]
+    chunksize = max(1, len(runs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_one, runs, chunksize=chunksize))
+
+
+def summarize(results: list[dict]) -> dict:
+    by_variant: dict[str, list[dict]] = {}
+    for r in results:
+        by_variant.setdefault(r["variant"], []).append(r)
+    summary = {}
+    for name, rs in by_variant.items():
+        depleted = [r["depleted_at"] for r in rs if r["depleted_at"] is not None]
+        summary[name] = {
+            "runs": len(rs),
+            "mean_utility": mean(r["utility"] for r in rs),
+            "depleted_runs": len(depleted),
+            "mean_depleted_at": mean(depleted) if depleted else None,
+        }
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Executa o ResourceModel sem interface, em paralelo."
+    )
+    parser.add_argument("config", help="arquivo JSON com variantes e seeds")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument(
+        "-o", "--output", help="grava um resultado JSON por linha neste arquivo"
+    )
+    parser.add_argument(
+        "--log-level", help="DEBUG, INFO, WARNING ou OFF (padrão: OFF sem --events-dir)"
+    )
+    parser.add_argument(
+        "--events-dir", help="grava os eventos de cada execução em JSONL nesta pasta"
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        help="grava snapshots de cada execução aqui e retoma deles se existirem",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=100,
+        help="passos entre snapshots (padrão: 100)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_sweep(
+        load_config(args.config),
+        workers=args.workers,
+        log_level=args.log_level,
+        events_dir=args.events_dir,
+        checkpoint_dir=args.checkpoint_dir,
+        checkpoint_every=args.checkpoint_every,
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            for r in results:
+                fh.write(json.dumps(r) + "\n")
+    json.dump(summarize(results), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import numpy as np
+from mesa.space import MultiGrid
+
+
+class ResourceGrid(MultiGrid):
+    """MultiGrid que mantém um índice vivo das posições com recursos.
+
+    Qualquer agente com ``resource_type`` colocado ou removido do grid é
+    refletido em ``resources``, então percorrer os recursos custa
+    O(recursos) em vez de O(largura × altura).
+
+    Em paralelo ao grid são mantidas camadas NumPy indexadas por ``[x, y]``:
+
+    - ``resource_layer``: valor (``ResourceType.value``) do recurso na célula, 0 se vazia;
+    - ``waiting``: quantidade de agentes com ``waiting_for_help`` na célula.
+
+    ``removed`` registra, em ordem, as posições que ficaram sem recursos; quem
+    guarda o tamanho já lido aplica só as remoções novas. ``taken`` faz o
+    mesmo com toda posição de onde saiu um recurso, mesmo que sobrem outros.
+    """
+
+    # o MultiGrid cria uma lista por célula chamando default_val; ``list`` é
+    # uma chamada em C, o que pesa em grids de milhões de células
+    default_val = staticmethod(list)
+
+    def __init__(self, width, height, torus):
+        super().__init__(width, height, torus)
+        self.resources: dict[tuple[int, int], list] = {}
+        self.removed: list[tuple[int, int]] = []
+        self.taken: list[tuple[int, int]] = []
+        self.resource_layer = np.zeros((width, height), dtype=np.int8)
+        self.waiting = np.zeros((width, height), dtype=np.int32)
+        self.resource_version = 0
+        self.waiting_version = 0
+        self._arrays = None
+        self._arrays_version = -1
+
+    def place_agent(self, agent, pos):
+        super().place_agent(agent, pos)
+        x, y = pos = agent.pos
+        if hasattr(agent, "resource_type"):
+            cell = self.resources.setdefault(pos, [])
+            cell.append(agent)
+            self.resource_layer[x, y] = agent.resource_type.value
+            self.resource_version += 1
+        elif getattr(agent, "waiting_for_help", False):
+            self.waiting[x, y] += 1
+            self.waiting_version += 1
+
+    def place_many(self, agents, xs, ys, values=None):
+        """Coloca ``agents[i]`` em ``(xs[i], ys[i])`` de uma vez.
+
+        Equivale a chamar ``place_agent`` em ordem, mas as camadas são
+        atualizadas com NumPy. Os agentes devem ser todos recursos (com
+        ``values``, o ``ResourceType.value`` de cada um) ou todos obstáculos.
+        """
+        if not agents:
+            return
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        cells = self._grid
+        positions = list(zip(xs.tolist(), ys.tolist()))
+        for agent, pos in zip(agents, positions):
+            cells[pos[0]][pos[1]].append(agent)
+            agent.pos = pos
+        if self._empties_built:
+            self._empties.difference_update(positions)
+        if values is None:
+            return
+        index = self.resources
+        for agent, pos in zip(agents, positions):
+            cell = index.get(pos)
+            if cell is None:
+                index[pos] = [agent]
+            else:
+                cell.append(agent)
+        # em células repetidas o valor visível é o do último colocado
+        flat = (xs * self.height + ys)[::-1]
+        _, first = np.unique(flat, return_index=True)
+        last = len(flat) - 1 - first
+        self.resource_layer[xs[last], ys[last]] = np.asarray(values)[last]
+        self.resource_version += 1
+
+    def remove_agent(self, agent):
+        pos = agent.pos
+        super().remove_agent(agent)
+        x, y = pos
+        if hasattr(agent, "resource_type"):
+            cell = self.resources.get(pos)
+            if cell and agent in cell:
+                cell.remove(agent)
+                self.taken.append(pos)
+                if cell:
+                    self.resource_layer[x, y] = cell[-1].resource_type.value
+                else:
+                    del self.resources[pos]
+                    self.resource_layer[x, y] = 0
+                    self.removed.append(pos)
+                self.resource_version += 1
+        elif getattr(agent, "waiting_for_help", False):
+            self.waiting[x, y] -= 1
+            self.waiting_version += 1
+
+    def resources_at(self, pos) -> list:
+        return self.resources.get(pos, [])
+
+    def resource_arrays(self):
+        """Posições e valores de todos os recursos como arrays ``(xs, ys, values)``.
+
+        O resultado é reaproveitado enquanto nenhum recurso for colocado ou
+        removido.
+        """
+        if self._arrays_version != self.resource_version:
+            n = len(self.resources)
+            xs = np.fromiter((p[0] for p in self.resources), np.int32, n)
+            ys = np.fromiter((p[1] for p in self.resources), np.int32, n)
+            self._arrays = (xs, ys, self.resource_layer[xs, ys])
+            self._arrays_version = self.resource_version
+        return self._arrays
+
+
+class WaitingFlag:
+    """Atributo ``waiting_for_help`` que mantém a camada ``waiting`` do grid.
+
+    O valor fica em ``_waiting_for_help``, que a classe do agente deve
+    declarar em ``__slots__``.
+    """
+
+    def __set_name__(self, owner, name):
+        self.attr = "_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return getattr(obj, self.attr, False)
+
+    def __set__(self, obj, value):
+        value = bool(value)
+        old = getattr(obj, self.attr, False)
+        setattr(obj, self.attr, value)
+        if value != old and obj.pos is not None:
+            x, y = obj.pos
+            grid = obj.model.grid
+            grid.waiting[x, y] += 1 if value else -1
+            grid.waiting_version += 1
@@ -0,0 +1,128 @@
+from collections.abc import Mapping, MutableMapping
+
+_EMPTY: frozenset = frozenset()
+
+
+class KnowledgeStore(Mapping):
+    """Conhecimento compartilhado sobre recursos: posição → ``ResourceType``.
+
+    Existe uma única cópia por modelo. Toda mudança é anexada a ``log`` como
+    ``(pos, tipo)`` (ou ``(pos, None)`` ao consumir), e ``version`` é o
+    tamanho do log; leitores guardam a versão já vista e aplicam só o delta.
+    ``listeners`` são chamados com o mesmo par a cada mudança.
+    """
+
+    def __init__(self):
+        self._entries: dict = {}
+        self.log: list[tuple] = []
+        self.listeners: list = []
+
+    @property
+    def version(self) -> int:
+        return len(self.log)
+
+    def __getitem__(self, pos):
+        return self._entries[pos]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, pos):
+        return pos in self._entries
+
+    def report(self, pos, rtype) -> bool:
+        """Registra ``rtype`` em ``pos``; retorna False se nada mudou."""
+        if self._entries.get(pos) == rtype:
+            return False
+        self._entries[pos] = rtype
+        self._changed(pos, rtype)
+        return True
+
+    def consume(self, pos) -> bool:
+        if self._entries.pop(pos, None) is None:
+            return False
+        self._changed(pos, None)
+        return True
+
+    def changes(self, since: int) -> list[tuple]:
+        return self.log[since:]
+
+    def view(self) -> "KnowledgeView":
+        return KnowledgeView(self)
+
+    def _changed(self, pos, rtype):
+        self.log.append((pos, rtype))
+        for fn in self.listeners:
+            fn(pos, rtype)
+
+
+class KnowledgeView(MutableMapping):
+    """Visão de um agente sobre o ``KnowledgeStore`` sem copiá-lo.
+
+    Guarda só o que é privado: ``overlay`` (posições vistas pelo agente que a
+    loja ainda não conhece) e ``hidden`` (posições da loja que o agente
+    descartou). As duas se ajustam preguiçosamente às mudanças da loja.
+    """
+
+    __slots__ = ("store", "overlay", "hidden", "_version")
+
+    def __init__(self, store: KnowledgeStore):
+        self.store = store
+        self.overlay: dict = {}
+        # um set vazio ocupa 216 bytes; o set só é criado no primeiro descarte
+        self.hidden: set | frozenset = _EMPTY
+        self._version = store.version
+
+    def _sync(self):
+        store = self.store
+        if self._version == store.version:
+            return
+        for pos, rtype in store.changes(self._version):
+            if rtype is None:
+                if pos in self.hidden:
+                    self.hidden.discard(pos)
+            else:
+                self.overlay.pop(pos, None)
+        self._version = store.version
+
+    def __getitem__(self, pos):
+        self._sync()
+        if pos in self.overlay:
+            return self.overlay[pos]
+        if pos in self.hidden:
+            raise KeyError(pos)
+        return self.store[pos]
+
+    def __setitem__(self, pos, rtype):
+        self._sync()
+        if pos in self.store:
+            if pos in self.hidden:
+                self.hidden.discard(pos)
+        else:
+            self.overlay[pos] = rtype
+
+    def __delitem__(self, pos):
+        self._sync()
+        if pos in self.overlay:
+            del self.overlay[pos]
+        elif pos in self.store and pos not in self.hidden:
+            if self.hidden is _EMPTY:
+                self.hidden = set()
+            self.hidden.add(pos)
+        else:
+            raise KeyError(pos)
+
+    def __iter__(self):
+        self._sync()
+        yield from self.overlay
+        hidden = self.hidden
+        for pos in self.store:
+            if pos not in hidden:
+                yield pos
+
+    def __len__(self):
+        self._sync()
+        return len(self.overlay) + len(self.store) - len(self.hidden)
@@ -1,12 +1,22 @@
-from mesa import Agent, Model
-from mesa.space import MultiGrid
+import gc
+from contextlib import contextmanager
+
+import numpy as np
+from mesa import Model
 from mesa.time import RandomActivation
 
 from environment.base import Base
-from environment.resource import ResourceType
-from environment.terrain import safe_move as _safe_move
+from environment.resource import ResourceType, Tally
+from environment.pathfinding import DistanceField, Pathfinder
+from environment.terrain import Terrain, safe_move as _safe_move
 from communication.messaging import MessageBus
+from instrumentation.events import DEBUG, INFO, EventLogger
+from instrumentation.profiler import StepProfiler
+from mesa_simulation.grid import ResourceGrid
+from mesa_simulation.knowledge import KnowledgeStore
+from mesa_simulation.scheduling import PhasedActivation
 
+from agents.compact import CompactAgent
 from agents.reactive import ReactiveAgent
 from agents.state_based import StateBasedAgent
 from agents.goal_based import GoalBasedAgent
@@ -14,36 +24,151 @@ from agents.cooperative import CooperativeAgent
 from agents.bdi import BDIAgent
 
 
-class BaseAgent(Agent):
-    pass
+_TYPE_VALUES = {rt.name: rt.value for rt in ResourceType}
+_BY_VALUE = {rt.value: rt for rt in ResourceType}
+
+
+def resource_columns(resources) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Recursos como arrays ``(xs, ys, values)``, na ordem em que serão colocados.
+
+    Aceita a lista de ``{"type": "METAL", "position": [x, y]}`` ou a forma em
+    colunas ``{"positions": array N×2, "types": array de ResourceType.value}``.
+    """
+    if isinstance(resources, dict):
+        pos = np.asarray(resources["positions"], dtype=np.int64).reshape(-1, 2)
+        values = np.asarray(resources["types"], dtype=np.int64)
+        if len(values) != len(pos):
+            raise ValueError("positions e types com tamanhos diferentes")
+    else:
+        n = len(resources)
+        pos = np.array([r["position"] for r in resources], np.int64).reshape(n, 2)
+        values = np.fromiter((_TYPE_VALUES[r["type"]] for r in resources), np.int64, n)
+    return pos[:, 0], pos[:, 1], values
+
+
+def obstacle_columns(obstacles) -> tuple[np.ndarray, np.ndarray]:
+    """Obstáculos (``{"position": [x, y]}``, ``[x, y]`` ou array N×2) como ``(xs, ys)``."""
+    if not isinstance(obstacles, np.ndarray):
+        obstacles = [o["position"] if isinstance(o, dict) else o for o in obstacles]
+    pos = np.asarray(obstacles, dtype=np.int64).reshape(-1, 2)
+    return pos[:, 0], pos[:, 1]
+
+
+@contextmanager
+def _bulk():
+    """Sem coleta cíclica enquanto milhares de objetos vivos são criados."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
 
-class ObstacleAgent(Agent):
-    pass
+class BaseAgent(CompactAgent):
+    __slots__ = ()
 
 
-class ResourceAgent(Agent):
+class ObstacleAgent(CompactAgent):
+    __slots__ = ()
+
+
+class ResourceAgent(CompactAgent):
+    __slots__ = ("resource_type",)
+
     def __init__(self, uid, model, rtype: ResourceType):
         super().__init__(uid, model)
         self.resource_type = rtype
 
 
 class ResourceModel(Model):
-    def __init__(self, width, height, agent_configs, resources, obstacles):
+    def __init__(
+        self,
+        width,
+        height,
+        agent_configs,
+        resources,
+        obstacles,
+        events=None,
+        inbox_capacity=256,
+        reap_interval=None,
+        seed=None,
+        batch_coop_scoring=False,
+        allocation_interval=0,
+        scheduler="random",
+        perceive_workers=1,
+        bounds=None,
+        first_uid=0,
+        profile=False,
+    ):
         super().__init__()
-        self.grid = MultiGrid(width, height, torus=False)
-        self.schedule = RandomActivation(self)
+        if seed is not None:
+            # todo sorteio (agendamento e agentes) sai de self.random
+            self.reset_randomizer(seed)
+        self.events = events if events is not None else EventLogger()
+        with _bulk():
+            self.grid = ResourceGrid(width, height, torus=False)
+            self.terrain = Terrain(width, height)
+        self.pathfinder = Pathfinder(self.terrain)
+        if scheduler == "phased":
+            self.schedule = PhasedActivation(self, workers=perceive_workers)
+        elif scheduler == "random":
+            self.schedule = RandomActivation(self)
+        else:
+            raise ValueError(f"Escalonador desconhecido: {scheduler}")
         self.base_position = (0, 0)
+        self.home = DistanceField(self.terrain, self.base_position)
         self.base = Base(self, position=None)
-        self.message_bus = MessageBus()
-        self.next_uid = 0
+        self.message_bus = MessageBus(default_capacity=inbox_capacity)
+        # crenças já chegam coalescidas por célula; não descartar nenhuma
+        self.message_bus.configure("BDI", capacity=None)
+        self.reap_interval = reap_interval
+        self.batch_coop_scoring = batch_coop_scoring
+        self.coop_targets = None
+        # a cada quantos passos o BDI distribui tarefas a todos os ociosos
+        # (BDIAgent._allocate); 0 mantém um anúncio por time. Compare os dois
+        # com benchmarks/allocation.py antes de mudar o padrão
+        self.allocation_interval = allocation_interval
+        # retângulo (x0, y0, x1, y1) deste modelo quando o mundo é dividido
+        # entre processos (mesa_simulation/sharding.py); None = mundo inteiro
+        self.bounds = bounds
+        # resumos dos agentes de outros shards, lidos pela alocação do BDI
+        self.remote_agents = []
+        # recursos dos outros shards, posição → ResourceType.value, com um
+        # passo de atraso: quem enxerga o mapa todo escolhe alvos também neles
+        self.remote_resources: dict[tuple[int, int], int] = {}
+        self.remote_version = 0
+        self._remote_arrays = None
+        self.next_uid = first_uid
         self.max_steps = 400
         self.running = True
-        self.total_resources = len(resources)
-        self.known_resources: dict[tuple[int, int], ResourceType] = {}
+        # cópia única do que os agentes sabem; cada agente lê por uma visão
+        self.known_resources = KnowledgeStore()
+        with _bulk():
+            self._populate(agent_configs, resources, obstacles)
+
+        # desligado custa nada; ligue e desligue a qualquer momento
+        self.profiler = StepProfiler(self)
+        if profile:
+            self.profiler.enable()
+
+    def _populate(self, agent_configs, resources, obstacles):
+        """Coloca base, obstáculos, agentes e recursos, nessa ordem de ``unique_id``.
+
+        Obstáculos e recursos entram em lote (``ResourceGrid.place_many``).
+        """
+        rxs, rys, rvalues = resource_columns(resources)
+        self.total_resources = len(rvalues)
         self.grid.place_agent(BaseAgent(self.next_uid, self), self.base_position)
         self.next_uid += 1
 
+        oxs, oys = obstacle_columns(obstacles)
+        self.terrain.add_obstacles(zip(oxs.tolist(), oys.tolist()))
+        self.grid.place_many(
+            [ObstacleAgent(uid, self) for uid in self._take_uids(len(oxs))], oxs, oys
+        )
+
         for cfg in agent_configs:
             pos = tuple(cfg["position"])
             agent = self._create_agent(cfg["type"])
@@ -51,27 +176,130 @@ class ResourceModel(Model):
             self.grid.place_agent(agent, pos)
 
         self.agents_log = {
-            a.unique_id: {rt: 0 for rt in ResourceType}
+            a.unique_id: Tally()
             for a in self.schedule.agents
             if hasattr(a, "delivered")
         }
 
-        for r in resources:
-            pos = tuple(r["position"])
-            self.grid.place_agent(
-                ResourceAgent(self.next_uid, self, ResourceType[r["type"]]), pos
-            )
-            self.next_uid += 1
+        by_value = _BY_VALUE
+        self.grid.place_many(
+            [
+                ResourceAgent(uid, self, by_value[v])
+                for uid, v in zip(self._take_uids(len(rvalues)), rvalues.tolist())
+            ],
+            rxs,
+            rys,
+            rvalues,
+        )
+
+    def _take_uids(self, n: int) -> range:
+        uids = range(self.next_uid, self.next_uid + n)
+        self.next_uid += n
+        return uids
 
     def safe_move(self, agent, pos):
-        _safe_move(self.grid, agent, pos, set())
+        _safe_move(self.grid, agent, pos, self.terrain.obstacles)
+
+    def free_neighbors(self, pos) -> list:
+        """Vizinhos ortogonais de ``pos`` para onde ``safe_move`` deixa ir."""
+        is_free = self.terrain.is_free
+        return [
+            p
+            for p in self.grid.get_neighborhood(pos, moore=False, include_center=False)
+            if is_free(*p)
+        ]
+
+    def step_towards(self, pos, dest):
+        """Próxima célula de um caminho até ``dest`` (``pos`` se não houver).
+
+        Viagens para a base usam o campo de distâncias pré-calculado; as
+        demais, o A* do ``pathfinder``.
+        """
+        if dest == self.base_position:
+            return self.home.next_step(pos) or pos
+        return self.pathfinder.next_step(pos, dest) or pos
+
+    def reachable(self, pos) -> bool:
+        """Se há caminho entre ``pos`` e a base.
+
+        Os agentes partem da base, então um alvo fora da componente dela nunca
+        é alcançado: quem o escolhe ficaria parado com ``step_towards``
+        devolvendo a própria posição.
+        """
+        return self.home.distance(pos) is not None
+
+    def plan_path(self, pos, dest):
+        if dest == self.base_position:
+            return self.home.path(pos)
+        return self.pathfinder.path(pos, dest)
+
+    def owns(self, pos) -> bool:
+        if self.bounds is None:
+            return True
+        x0, y0, x1, y1 = self.bounds
+        return x0 <= pos[0] < x1 and y0 <= pos[1] < y1
 
-    def report_resource(self, pos, rtype):
-        if pos not in self.known_resources:
-            self.known_resources[pos] = rtype
+    def depleted(self) -> bool:
+        """Nenhum recurso no grid e nenhum agente carregando algum.
+
+        ``total_resources`` não serve para isso: cada agente de uma dupla que
+        entrega a mesma STRUCTURE o decrementa.
+        """
+        if self.grid.resources:
+            return False
+        return not any(getattr(a, "carrying", None) for a in self.schedule.agents)
+
+    def report_resource(self, pos, rtype) -> bool:
+        """Registra um recurso avistado; avisos sobre células já vazias são ignorados.
+
+        Fora de ``bounds`` o grid local não tem os recursos, então o aviso é
+        aceito como está.
+        """
+        if pos in self.known_resources:
+            return False
+        if self.owns(pos) and not self.grid.resources_at(pos):
+            return False
+        return self.known_resources.report(pos, rtype)
+
+    def has_resources(self) -> bool:
+        """Se resta algum recurso no mundo, contando os dos outros shards."""
+        return bool(self.grid.resources or self.remote_resources)
+
+    def has_resource(self, pos) -> bool:
+        return bool(self.grid.resources_at(pos)) or pos in self.remote_resources
+
+    def resource_arrays(self):
+        """``grid.resource_arrays()`` mais os recursos dos outros shards."""
+        arrays = self.grid.resource_arrays()
+        if not self.remote_resources:
+            return arrays
+        key = (self.grid.resource_version, self.remote_version)
+        if self._remote_arrays is None or self._remote_arrays[0] != key:
+            remote = self.remote_resources
+            n = len(remote)
+            rxs = np.fromiter((p[0] for p in remote), np.int32, n)
+            rys = np.fromiter((p[1] for p in remote), np.int32, n)
+            rvalues = np.fromiter(remote.values(), arrays[2].dtype, n)
+            merged = tuple(
+                np.concatenate([a, b]) for a, b in zip(arrays, (rxs, rys, rvalues))
+            )
+            self._remote_arrays = (key, merged)
+        return self._remote_arrays[1]
 
     def consume_resource_info(self, pos):
-        self.known_resources.pop(pos, None)
+        """Atualiza o conhecimento após uma coleta em ``pos``.
+
+        Se ainda houver recursos na célula, ela continua conhecida com o tipo
+        do recurso que sobrou.
+        """
+        left = self.grid.resources_at(pos)
+        if left:
+            if pos in self.known_resources:
+                self.known_resources.report(pos, left[-1].resource_type)
+        else:
+            self.known_resources.consume(pos)
+            # crenças sobre a célula vazia já não precisam de deduplicação
+            self.message_bus.forget(pos)
 
     def _create_agent(self, kind: str):
         uid = self.next_uid
@@ -106,9 +334,30 @@ class ResourceModel(Model):
         return agent
 
     def step(self):
-        print(f"\n─── PASSO {self.schedule.time:03} ───")
-        if self.schedule.time >= self.max_steps:
-            print("Tempestade de radiação! Encerrando a coleta.")
+        t = self.schedule.time
+        if DEBUG >= self.events.level:
+            self.events.emit(DEBUG, "MODEL", None, t, "─── PASSO %03d ───", (t,))
+        if t >= self.max_steps:
+            if INFO >= self.events.level:
+                self.events.emit(
+                    INFO,
+                    "MODEL",
+                    None,
+                    t,
+                    "Tempestade de radiação! Encerrando a coleta.",
+                )
             self.running = False
+            self.events.flush()
             return
         self.schedule.step()
+        if self.reap_interval and self.schedule.time % self.reap_interval == 0:
+            for name in self.message_bus.reap():
+                if INFO >= self.events.level:
+                    self.events.emit(
+                        INFO,
+                        "MODEL",
+                        None,
+                        t,
+                        "canal sem consumidor fechado: %s",
+                        (name,),
+                    )
@@ -0,0 +1,283 @@
+"""Geração de mundos reproduzíveis e arquivos de cenário compactos.
+
+``generate`` monta os parâmetros de um ``ResourceModel`` a partir de poucos
+números (tamanho, mistura de tipos, aglomerados, densidade de obstáculos,
+agentes de cada tipo), com recursos e obstáculos em colunas NumPy. A mesma
+seed gera sempre o mesmo mundo.
+
+``save``/``load`` gravam e leem esses parâmetros em um arquivo binário:
+``MAGIC``, versão, um cabeçalho JSON (grid, agentes, e dtype/forma/offset de
+cada array) e os arrays alinhados, lidos com ``np.memmap`` sem copiar. No
+modo em lote, ``"scenario": "mundo.rmsc"`` no topo ou em uma variante
+substitui ``width``, ``height``, ``resources``, ``obstacles`` e
+``agent_configs``:
+
+    python -m mesa_simulation.scenario mundo.rmsc --size 2000x500 --resources 200000
+"""
+
+import argparse
+import json
+import struct
+import sys
+
+import numpy as np
+
+from environment.pathfinding import DistanceField
+from environment.resource import ResourceType
+from environment.terrain import Terrain
+from mesa_simulation.model import obstacle_columns, resource_columns
+
+MAGIC = b"RMSC"
+VERSION = 1
+_HEADER = struct.Struct("<4sHI")
+_ALIGN = 64
+
+DEFAULT_MIX = {"CRYSTAL": 5, "METAL": 3, "STRUCTURE": 2}
+DEFAULT_AGENTS = {
+    "BDI": 1,
+    "REACTIVE": 1,
+    "STATE_BASED": 1,
+    "GOAL_BASED": 1,
+    "COOPERATIVE": 2,
+}
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+def _reachable(blocked: np.ndarray, base) -> np.ndarray:
+    """Máscara das células que alcançam ``base`` sem passar por ``blocked``.
+
+    Usa o mesmo BFS do ``DistanceField`` que guia os agentes até a base.
+    """
+    width, height = blocked.shape
+    if not blocked.any():
+        return np.ones((width, height), dtype=bool)
+    terrain = Terrain(width, height)
+    terrain.add_obstacles(map(tuple, np.argwhere(blocked).tolist()))
+    field = DistanceField(terrain, base)
+    field.distance(base)
+    dist = np.frombuffer(field._dist, dtype=np.int32)
+    return dist.reshape(width, height) >= 0
+
+
+def _free_cells(blocked: np.ndarray, n: int, sample) -> np.ndarray:
+    """``n`` posições sorteadas por ``sample(k)`` fora de ``blocked``.
+
+    As posições podem se repetir: uma célula recebe então vários recursos.
+    """
+    out = np.empty((0, 2), dtype=np.int32)
+    while len(out) < n:
+        pos = sample(max(n - len(out), 1024))
+        pos = pos[~blocked[pos[:, 0], pos[:, 1]]]
+        out = np.concatenate([out, pos[: n - len(out)]])
+    return out
+
+
+def generate(
+    width: int,
+    height: int,
+    resources: int,
+    mix: dict | None = None,
+    clusters: int = 0,
+    spread: float = 3.0,
+    obstacle_density: float = 0.0,
+    agents: dict | None = None,
+    seed: int = 0,
+) -> dict:
+    """Parâmetros de um ``ResourceModel`` para um mundo sorteado com ``seed``.
+
+    ``mix`` dá o peso de cada tipo de recurso. Com ``clusters > 0`` os
+    recursos se espalham em torno de ``clusters`` centros, com desvio
+    ``spread`` células; com 0, uniformemente. ``obstacle_density`` é a
+    fração de células bloqueadas; a base e as células com recurso ficam
+    livres, e todo recurso cai em uma célula com caminho até a base (sorteios
+    em bolsões fechados por obstáculos são refeitos). Vários recursos podem
+    cair na mesma célula, empilhados. Os agentes, ``{tipo: quantidade}``,
+    começam na base.
+    """
+    rng = np.random.default_rng(seed)
+    mix = mix or DEFAULT_MIX
+    agents = DEFAULT_AGENTS if agents is None else agents
+    base = (0, 0)
+
+    blocked = rng.random((width, height)) < obstacle_density
+    blocked[base] = False
+    # recursos só onde os agentes conseguem buscar; a base não recebe nenhum
+    forbidden = ~_reachable(blocked, base)
+    forbidden[base] = True
+    if resources and forbidden.all():
+        raise ScenarioError("nenhuma célula livre alcançável a partir da base")
+
+    if clusters > 0:
+        centers = np.stack(
+            [rng.integers(0, width, clusters), rng.integers(0, height, clusters)],
+            axis=1,
+        )
+
+        def sample(k):
+            offsets = np.rint(rng.normal(0.0, spread, (k, 2))).astype(np.int64)
+            pos = centers[rng.integers(0, clusters, k)] + offsets
+            return np.clip(pos, 0, [width - 1, height - 1])
+
+    else:
+
+        def sample(k):
+            return np.stack(
+                [rng.integers(0, width, k), rng.integers(0, height, k)], axis=1
+            )
+
+    positions = _free_cells(forbidden, resources, sample)
+    names = list(mix)
+    weights = np.array([mix[n] for n in names], dtype=float)
+    values = np.array([ResourceType[n].value for n in names], dtype=np.int8)
+    types = values[rng.choice(len(names), resources, p=weights / weights.sum())]
+
+    obstacles = np.argwhere(blocked).astype(np.int32)
+    return {
+        "width": width,
+        "height": height,
+        "agent_configs": [
+            {"type": kind, "position": list(base)}
+            for kind, n in agents.items()
+            for _ in range(n)
+        ],
+        "resources": {"positions": positions.astype(np.int32), "types": types},
+        "obstacles": obstacles,
+    }
+
+
+def _arrays(params: dict) -> dict:
+    xs, ys, values = resource_columns(params["resources"])
+    oxs, oys = obstacle_columns(params["obstacles"])
+    return {
+        "resource_positions": np.stack([xs, ys], axis=1).astype(np.int32),
+        "resource_types": values.astype(np.int8),
+        "obstacles": np.stack([oxs, oys], axis=1).astype(np.int32),
+    }
+
+
+def save(params: dict, path: str) -> None:
+    """Grava ``params`` (colunas ou listas de dicts) no formato binário."""
+    arrays = _arrays(params)
+    layout, offset = {}, 0
+    for name, a in arrays.items():
+        layout[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset += -(-a.nbytes // _ALIGN) * _ALIGN
+    header = json.dumps(
+        {
+            "width": params["width"],
+            "height": params["height"],
+            "agent_configs": params["agent_configs"],
+            "arrays": layout,
+        }
+    ).encode("utf-8")
+    start = -(-(_HEADER.size + len(header)) // _ALIGN) * _ALIGN
+    with open(path, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, VERSION, len(header)))
+        fh.write(header)
+        for name, a in arrays.items():
+            fh.seek(start + layout[name]["offset"])
+            fh.write(np.ascontiguousarray(a).tobytes())
+        fh.truncate(start + offset)
+
+
+def load(path: str, mmap: bool = True) -> dict:
+    """Parâmetros gravados por ``save``; com ``mmap`` os arrays vêm do disco sob demanda."""
+    with open(path, "rb") as fh:
+        raw = fh.read(_HEADER.size)
+        if len(raw) < _HEADER.size:
+            raise ScenarioError(f"{path}: arquivo truncado")
+        magic, version, size = _HEADER.unpack(raw)
+        if magic != MAGIC:
+            raise ScenarioError(f"{path}: não é um arquivo de cenário")
+        if version != VERSION:
+            raise ScenarioError(f"{path}: versão não suportada: {version}")
+        header = json.loads(fh.read(size))
+    start = -(-(_HEADER.size + size) // _ALIGN) * _ALIGN
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        offset = start + spec["offset"]
+        if not np.prod(shape):
+            arrays[name] = np.empty(shape, dtype)
+        elif mmap:
+            arrays[name] = np.memmap(path, dtype, "r", offset, shape)
+        else:
+            count = int(np.prod(shape))
+            data = np.fromfile(path, dtype, count, offset=offset)
+            arrays[name] = data.reshape(shape)
+    return {
+        "width": header["width"],
+        "height": header["height"],
+        "agent_configs": header["agent_configs"],
+        "resources": {
+            "positions": arrays["resource_positions"],
+            "types": arrays["resource_types"],
+        },
+        "obstacles": arrays["obstacles"],
+    }
+
+
+def resolve(params: dict) -> dict:
+    """Troca ``"scenario": caminho`` pelos parâmetros do arquivo.
+
+    Chaves presentes em ``params`` têm precedência sobre as do arquivo.
+    """
+    if "scenario" not in params:
+        return params
+    rest = {k: v for k, v in params.items() if k != "scenario"}
+    return {**load(params["scenario"]), **rest}
+
+
+def _counts(text: str) -> dict:
+    out = {}
+    for item in text.split(","):
+        name, _, n = item.partition("=")
+        out[name.strip().upper()] = float(n) if "." in n else int(n)
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="arquivo de cenário a gravar")
+    parser.add_argument("--size", default="100x100", help="largura x altura")
+    parser.add_argument("--resources", type=int, default=500)
+    parser.add_argument(
+        "--mix", type=_counts, default=DEFAULT_MIX, help="pesos, ex.: CRYSTAL=5,METAL=3"
+    )
+    parser.add_argument("--clusters", type=int, default=0)
+    parser.add_argument("--spread", type=float, default=3.0)
+    parser.add_argument(
+        "--obstacles", type=float, default=0.0, help="fração de células bloqueadas"
+    )
+    parser.add_argument(
+        "--agents", type=_counts, default=None, help="ex.: BDI=1,GOAL_BASED=20"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    width, height = (int(n) for n in args.size.lower().split("x"))
+
+    params = generate(
+        width,
+        height,
+        args.resources,
+        mix=args.mix,
+        clusters=args.clusters,
+        spread=args.spread,
+        obstacle_density=args.obstacles,
+        agents=args.agents,
+        seed=args.seed,
+    )
+    save(params, args.output)
+    print(
+        f"{args.output}: {width}x{height}, {args.resources} recursos, "
+        f"{len(params['obstacles'])} obstáculos, "
+        f"{len(params['agent_configs'])} agentes"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
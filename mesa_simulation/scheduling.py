@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from mesa.time import BaseScheduler
+
+
+class PhasedActivation(BaseScheduler):
+    """Ativa os agentes em duas fases por passo: ``perceive`` e depois ``act``.
+
+    Na fase ``perceive`` nenhum agente altera o mundo: cada um lê o estado
+    deixado pelo passo anterior (grid, conhecimento compartilhado, caixa de
+    entrada) e decide o que fazer, guardando a decisão em si mesmo. Por isso
+    a fase pode rodar em ``workers`` threads; os sorteios ficam para ``act``.
+
+    Na fase ``act`` os agentes aplicam suas decisões um de cada vez, na ordem
+    sorteada pelo ``model.random``. Conflitos se resolvem por essa ordem: o
+    primeiro a agir coleta o recurso, forma a dupla ou ocupa a célula, e quem
+    vem depois encontra o mundo já alterado (a coleta simplesmente falha).
+    Agentes sem ``perceive``/``act`` executam ``step`` inteiro em ``act``.
+    """
+
+    def __init__(self, model, workers: int = 1):
+        super().__init__(model)
+        self.workers = workers
+        self._pool = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    def step(self) -> None:
+        keys = self.get_agent_keys(shuffle=True)
+        agents = [self._agents[k] for k in keys]
+        perceive = [a.perceive for a in agents if hasattr(a, "perceive")]
+        if self.workers > 1 and len(perceive) > 1:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers)
+            for f in [self._pool.submit(fn) for fn in perceive]:
+                f.result()
+        else:
+            for fn in perceive:
+                fn()
+        for agent in agents:
+            if agent.unique_id in self._agents:
+                getattr(agent, "act", agent.step)()
+        self.steps += 1
+        self.time += 1
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
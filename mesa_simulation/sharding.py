@@ -0,0 +1,501 @@
+"""Execução de um mundo grande dividido em retângulos (shards) entre processos.
+
+Cada processo roda um ``ResourceModel`` com o grid inteiro, mas só com os
+agentes e recursos do seu retângulo (``bounds``); obstáculos são copiados para
+todos, então os caminhos continuam corretos. Os passos andam em sincronia: a
+cada passo o coordenador entrega a cada shard o que chegou dos outros e
+recebe de volta:
+
+- agentes que saíram do retângulo (migram com estado e caixa de entrada);
+- mensagens para destinatários de outro shard (``"BDI"`` e tarefas diretas);
+- mensagens publicadas em tópicos (``GOAL``, ``STATE``...);
+- mudanças no conhecimento sobre recursos do próprio retângulo;
+- células do próprio retângulo de onde saíram recursos, para a cópia que
+  cada shard guarda dos recursos dos outros (``model.remote_resources``);
+- resumos (``RemoteAgent``) dos agentes dos times do BDI, entregues só ao
+  shard do BDI para que a alocação alcance o mundo inteiro.
+
+Só se coleta no shard dono da célula, mas a escolha de alvos e a validação
+de tarefas do ``CooperativeAgent``, que enxerga o mapa todo, usam também a
+cópia dos recursos dos outros shards. Essa cópia, o conhecimento
+compartilhado e os resumos chegam com um passo de atraso. A base fica em um
+único shard, e quem carrega um recurso migra até ele para entregar.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import sys
+from bisect import bisect_right
+
+import numpy as np
+
+from agents.bdi import TEAMS, BDIAgent
+from agents.compact import CompactAgent, agent_state
+from environment.resource import Tally
+from instrumentation.events import EventLogger
+from mesa_simulation.batch import expand_runs, load_config, summarize
+from mesa_simulation.knowledge import KnowledgeView
+from mesa_simulation.model import ResourceModel, resource_columns
+from mesa_simulation.scenario import resolve
+
+UID_STRIDE = 1_000_000
+ROUTER = "_router"
+
+
+def _cuts(size: int, parts: int) -> list[int]:
+    return [round(i * size / parts) for i in range(parts + 1)]
+
+
+class ShardLayout:
+    """Divide ``width × height`` em ``cols × rows`` retângulos."""
+
+    def __init__(self, width: int, height: int, cols: int, rows: int):
+        self.xs = _cuts(width, cols)
+        self.ys = _cuts(height, rows)
+        self.cols, self.rows = cols, rows
+
+    def __len__(self):
+        return self.cols * self.rows
+
+    def bounds(self, i: int) -> tuple[int, int, int, int]:
+        cx, cy = divmod(i, self.rows)
+        return self.xs[cx], self.ys[cy], self.xs[cx + 1], self.ys[cy + 1]
+
+    def owner(self, pos) -> int:
+        cx = min(bisect_right(self.xs, pos[0]) - 1, self.cols - 1)
+        cy = min(bisect_right(self.ys, pos[1]) - 1, self.rows - 1)
+        return cx * self.rows + cy
+
+    def owners(self, xs, ys) -> np.ndarray:
+        """``owner`` de cada posição ``(xs[i], ys[i])``, em arrays."""
+        cx = np.searchsorted(self.xs, xs, side="right") - 1
+        cy = np.searchsorted(self.ys, ys, side="right") - 1
+        cx = np.minimum(cx, self.cols - 1)
+        cy = np.minimum(cy, self.rows - 1)
+        return cx * self.rows + cy
+
+
+class RemoteAgent:
+    """O que ``BDIAgent._allocate`` lê de um agente que está em outro shard."""
+
+    __slots__ = (
+        "cls",
+        "unique_id",
+        "name",
+        "pos",
+        "carrying",
+        "waiting_for_help",
+        "current_task",
+    )
+
+    def __init__(self, agent):
+        self.cls = type(agent)
+        self.unique_id = agent.unique_id
+        self.name = agent.name
+        self.pos = agent.pos
+        self.carrying = agent.carrying
+        self.waiting_for_help = agent.waiting_for_help
+        self.current_task = getattr(agent, "current_task", None)
+
+
+class Shard:
+    """Lado do processo de trabalho: um modelo e a troca com os demais shards."""
+
+    def __init__(
+        self, index: int, bounds, params: dict, seed, max_steps=None, remote=None
+    ):
+        self.model = ResourceModel(
+            **params,
+            events=EventLogger(level="OFF", echo=False),
+            seed=None if seed is None else seed + index,
+            bounds=bounds,
+            first_uid=index * UID_STRIDE,
+        )
+        if max_steps is not None:
+            self.model.max_steps = max_steps
+        self._knowledge_seen = self.model.known_resources.version
+        self._removed_seen = len(self.model.grid.removed)
+        self._taken_seen = len(self.model.grid.taken)
+        if remote is not None:
+            xs, ys, values = remote
+            self.model.remote_resources = dict(
+                zip(zip(xs.tolist(), ys.tolist()), values.tolist())
+            )
+        bus = self.model.message_bus
+        for name in list(bus.topics):
+            bus.subscribe(name, ROUTER)
+
+    def local_ids(self) -> set[int]:
+        return {a.unique_id for a in self.model.schedule.agents}
+
+    def has_bdi(self) -> bool:
+        return any(isinstance(a, BDIAgent) for a in self.model.schedule.agents)
+
+    def step(self, inbound: dict) -> dict:
+        model, bus = self.model, self.model.message_bus
+        for state in inbound["agents"]:
+            self._import(state)
+        for recipient, content in inbound["messages"]:
+            bus.send(recipient, content)
+        for topic, content in inbound["publish"]:
+            bus.publish(topic, content)
+        for t in bus.topics.values():
+            t.cursors[ROUTER] = t.head
+        store = model.known_resources
+        for pos, rt in inbound["knowledge"]:
+            if rt is None:
+                store.consume(pos)
+                bus.forget(pos)
+            else:
+                store.report(pos, rt)
+        model.remote_agents = inbound["roster"]
+        if inbound["resources"]:
+            remote = model.remote_resources
+            for pos, value in inbound["resources"]:
+                if value:
+                    remote[pos] = value
+                else:
+                    remote.pop(pos, None)
+            model.remote_version += 1
+
+        model.step()
+
+        emigrants = [
+            self._export(a)
+            for a in list(model.schedule.agents)
+            if a.pos is not None and not model.owns(a.pos)
+        ]
+        return {
+            "agents": emigrants,
+            "messages": self._outgoing_messages(),
+            "publish": self._outgoing_publishes(),
+            "knowledge": self._outgoing_knowledge(),
+            "resources": self._outgoing_resources(),
+            "roster": self._roster(),
+            "depleted": model.depleted(),
+            "running": model.running,
+        }
+
+    def _outgoing_resources(self) -> list:
+        """``(posição, valor do recurso que sobrou ou 0)`` das células coletadas."""
+        model, grid = self.model, self.model.grid
+        cells = dict.fromkeys(
+            pos for pos in grid.taken[self._taken_seen :] if model.owns(pos)
+        )
+        self._taken_seen = len(grid.taken)
+        out = []
+        for pos in cells:
+            left = grid.resources_at(pos)
+            out.append((pos, left[-1].resource_type.value if left else 0))
+        return out
+
+    def _roster(self) -> list:
+        model = self.model
+        if not model.allocation_interval or self.has_bdi():
+            return []
+        teams = tuple(TEAMS.values())
+        return [RemoteAgent(a) for a in model.schedule.agents if isinstance(a, teams)]
+
+    def _outgoing_messages(self) -> list:
+        bus = self.model.message_bus
+        local = {str(uid) for uid in self.local_ids()}
+        if self.has_bdi():
+            local.add("BDI")
+        out = []
+        for name in [n for n in bus.channels if n not in local]:
+            chan = bus.channels[name]
+            out.extend((name, content) for content in chan.drain())
+            if name != "BDI":
+                # canal de um agente que migrou: não fica assinando o broadcast
+                del bus.channels[name]
+                bus.registered.discard(name)
+                for t in bus.topics.values():
+                    t.cursors.pop(name, None)
+        return out
+
+    def _outgoing_publishes(self) -> list:
+        bus = self.model.message_bus
+        out = []
+        for name, t in bus.topics.items():
+            if ROUTER not in t.cursors:
+                bus.subscribe(name, ROUTER)
+            out.extend((name, msg) for msg in bus.poll(name, ROUTER))
+        return out
+
+    def _outgoing_knowledge(self) -> list:
+        model = self.model
+        store, grid = model.known_resources, model.grid
+        changes = [
+            (pos, rt)
+            for pos, rt in store.changes(self._knowledge_seen)
+            if model.owns(pos)
+        ]
+        self._knowledge_seen = store.version
+        # células esvaziadas que a loja local nem conhecia podem ter sido
+        # avisadas ao BDI de outro shard
+        changes.extend(
+            (pos, None)
+            for pos in grid.removed[self._removed_seen :]
+            if not grid.resources_at(pos)
+        )
+        self._removed_seen = len(grid.removed)
+        return changes
+
+    def _export(self, agent) -> dict:
+        model, bus = self.model, self.model.message_bus
+        uid = str(agent.unique_id)
+        pos = agent.pos
+        model.grid.remove_agent(agent)
+        model.schedule.remove(agent)
+        chan = bus.channels.pop(uid, None)
+        inbox = chan.drain() if chan is not None else []
+        bus.registered.discard(uid)
+        topics = []
+        for name, t in bus.topics.items():
+            if uid in t.cursors:
+                topics.append(name)
+                inbox.extend(bus.poll(name, uid))
+                del t.cursors[uid]
+        state, views = {}, {}
+        for k, v in agent_state(agent).items():
+            if k in ("model", "pos"):
+                continue
+            if isinstance(v, KnowledgeView):
+                views[k] = (v.overlay, v.hidden)
+            else:
+                state[k] = v
+        return {
+            "cls": type(agent),
+            "pos": pos,
+            "state": state,
+            "views": views,
+            "topics": topics,
+            "inbox": inbox,
+        }
+
+    def _import(self, exported: dict):
+        model, bus = self.model, self.model.message_bus
+        cls = exported["cls"]
+        agent = cls.__new__(cls)
+        state = exported["state"]
+        CompactAgent.__init__(agent, state["unique_id"], model)
+        for k, v in state.items():
+            setattr(agent, k, v)
+        store = model.known_resources
+        for name, (overlay, hidden) in exported["views"].items():
+            view = store.view()
+            view.overlay = {p: rt for p, rt in overlay.items() if p not in store}
+            view.hidden = {p for p in hidden if p in store}
+            setattr(agent, name, view)
+        if hasattr(agent, "_removed_cursor"):
+            agent._removed_cursor = len(model.grid.removed)
+        if hasattr(agent, "delivered"):
+            model.agents_log.setdefault(agent.unique_id, Tally(agent.delivered))
+        model.schedule.add(agent)
+        model.grid.place_agent(agent, exported["pos"])
+        uid = str(agent.unique_id)
+        bus.register(uid)
+        for name in exported["topics"]:
+            bus.subscribe(name, uid)
+        for content in exported["inbox"]:
+            bus.send(uid, content)
+
+    def result(self) -> dict:
+        model = self.model
+        return {
+            "steps": model.schedule.time,
+            "utility": model.base.get_total_utility(),
+            "delivered": {
+                getattr(a, "name", str(a.unique_id)): {
+                    rt.name: n for rt, n in a.delivered.items()
+                }
+                for a in model.schedule.agents
+                if hasattr(a, "delivered")
+            },
+        }
+
+
+def _worker(conn, index, bounds, params, seed, max_steps, remote):
+    shard = Shard(index, bounds, params, seed, max_steps, remote)
+    conn.send({"agents": shard.local_ids(), "bdi": shard.has_bdi()})
+    while True:
+        cmd, arg = conn.recv()
+        if cmd == "step":
+            conn.send(shard.step(arg))
+        elif cmd == "result":
+            conn.send(shard.result())
+        else:
+            break
+    conn.close()
+
+
+def _split(params: dict, layout: ShardLayout) -> list[dict]:
+    parts = [
+        {**params, "agent_configs": [], "resources": []} for _ in range(len(layout))
+    ]
+    for cfg in params["agent_configs"]:
+        parts[layout.owner(cfg["position"])]["agent_configs"].append(cfg)
+    resources = params["resources"]
+    if isinstance(resources, dict):
+        xs, ys, values = resource_columns(resources)
+        owners = layout.owners(xs, ys)
+        for i, part in enumerate(parts):
+            mask = owners == i
+            part["resources"] = {
+                "positions": np.stack([xs[mask], ys[mask]], axis=1),
+                "types": values[mask],
+            }
+        return parts
+    for r in resources:
+        parts[layout.owner(r["position"])]["resources"].append(r)
+    return parts
+
+
+def _remote(params: dict, layout: ShardLayout) -> list:
+    """Colunas ``(xs, ys, values)`` dos recursos fora de cada shard."""
+    xs, ys, values = resource_columns(params["resources"])
+    owners = layout.owners(xs, ys)
+    return [
+        (xs[owners != i], ys[owners != i], values[owners != i])
+        for i in range(len(layout))
+    ]
+
+
+def _empty_inbound() -> dict:
+    return {
+        "agents": [],
+        "messages": [],
+        "publish": [],
+        "knowledge": [],
+        "resources": [],
+        "roster": [],
+    }
+
+
+def run_sharded(
+    params: dict, cols: int = 2, rows: int = 1, seed=None, max_steps=None
+) -> dict:
+    """Executa um modelo dividido em ``cols × rows`` processos até esgotar os recursos.
+
+    Retorna os mesmos campos de ``batch.run_one``.
+    """
+    params = resolve(params)
+    layout = ShardLayout(params["width"], params["height"], cols, rows)
+    ctx = mp.get_context()
+    conns, procs = [], []
+    remote = _remote(params, layout)
+    for i, part in enumerate(_split(params, layout)):
+        parent, child = ctx.Pipe()
+        p = ctx.Process(
+            target=_worker,
+            args=(child, i, layout.bounds(i), part, seed, max_steps, remote[i]),
+            daemon=True,
+        )
+        p.start()
+        conns.append(parent)
+        procs.append(p)
+
+    try:
+        where: dict[int, int] = {}
+        bdi_shard = None
+        for i, conn in enumerate(conns):
+            hello = conn.recv()
+            where.update((uid, i) for uid in hello["agents"])
+            if hello["bdi"] and bdi_shard is None:
+                bdi_shard = i
+
+        inbound = [_empty_inbound() for _ in conns]
+        depleted_at = None
+        steps = 0
+        while True:
+            for conn, inb in zip(conns, inbound):
+                conn.send(("step", inb))
+            outs = [conn.recv() for conn in conns]
+            inbound = [_empty_inbound() for _ in conns]
+            for src, out in enumerate(outs):
+                for state in out["agents"]:
+                    dst = layout.owner(state["pos"])
+                    where[state["state"]["unique_id"]] = dst
+                    inbound[dst]["agents"].append(state)
+            for src, out in enumerate(outs):
+                for recipient, content in out["messages"]:
+                    if recipient == "BDI":
+                        dst = bdi_shard
+                    else:
+                        dst = where.get(int(recipient)) if recipient.isdigit() else None
+                    if dst is not None and dst != src:
+                        inbound[dst]["messages"].append((recipient, content))
+                for key in ("publish", "knowledge", "resources"):
+                    for dst in range(len(conns)):
+                        if dst != src:
+                            inbound[dst][key].extend(out[key])
+                if bdi_shard is not None and src != bdi_shard:
+                    inbound[bdi_shard]["roster"].extend(out["roster"])
+            if not any(out["running"] for out in outs):
+                break
+            steps += 1
+            # quem migra carregando um recurso não está em nenhum shard
+            in_transit = any(
+                state["state"].get("carrying")
+                for inb in inbound
+                for state in inb["agents"]
+            )
+            if all(out["depleted"] for out in outs) and not in_transit:
+                depleted_at = steps
+                break
+
+        results = []
+        for conn in conns:
+            conn.send(("result", None))
+            results.append(conn.recv())
+    finally:
+        for conn in conns:
+            try:
+                conn.send(("stop", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for p in procs:
+            p.join()
+
+    delivered = {}
+    for r in results:
+        delivered.update(r["delivered"])
+    return {
+        "steps": max(r["steps"] for r in results),
+        "utility": sum(r["utility"] for r in results),
+        "depleted_at": depleted_at,
+        "delivered": delivered,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Executa cada variante com o mundo dividido entre processos."
+    )
+    parser.add_argument("config", help="arquivo JSON no formato do modo em lote")
+    parser.add_argument(
+        "--shards", default="2x1", help="colunas x linhas de shards (padrão: 2x1)"
+    )
+    parser.add_argument(
+        "-o", "--output", help="grava um resultado JSON por linha neste arquivo"
+    )
+    args = parser.parse_args(argv)
+    cols, rows = (int(n) for n in args.shards.lower().split("x"))
+
+    results = []
+    for spec in expand_runs(load_config(args.config)):
+        r = run_sharded(spec["params"], cols, rows, spec["seed"], spec["max_steps"])
+        results.append({"variant": spec["variant"], "seed": spec["seed"], **r})
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            for r in results:
+                fh.write(json.dumps(r) + "\n")
+    json.dump(summarize(results), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,10 @@
 from mesa.visualization.ModularVisualization import ModularServer
 from mesa.visualization.modules import CanvasGrid, TextElement
-from mesa.datacollection import DataCollector
 
 from mesa_simulation.model import ResourceModel
 from environment.resource import ResourceType
+from instrumentation.events import DEBUG, EventLogger
+from instrumentation.recorder import TimeSeriesRecorder
 
 
 VALUE_MAP = {
@@ -13,29 +14,15 @@ VALUE_MAP = {
 }
 
 
-def _utility(model):
-    storage = getattr(model.base, "storage", {})
-    return sum(storage.get(rt, 0) * val for rt, val in VALUE_MAP.items())
-
-
-def _count(resource):
-    return lambda m: getattr(m.base, "storage", {}).get(resource, 0)
-
-
 class InstrumentedModel(ResourceModel):
     def __init__(self, **kwargs):
+        kwargs.setdefault("events", EventLogger(level=DEBUG))
         super().__init__(**kwargs)
-        self.datacollector = DataCollector(
-            model_reporters={
-                "Utility": _utility,
-                "Cristais": _count(ResourceType.CRYSTAL),
-                "Metais": _count(ResourceType.METAL),
-                "Estruturas": _count(ResourceType.STRUCTURE),
-            }
-        )
+        # utilidade, armazenamento e estado dos agentes a cada passo
+        self.recorder = TimeSeriesRecorder(self)
 
     def step(self):
-        self.datacollector.collect(self)
+        self.recorder.collect()
         super().step()
 
 
@@ -111,6 +98,16 @@ def agent_portrayal(agent):
             "stroke_color": "black",
         }
 
+    if agent.__class__.__name__ == "ObstacleAgent":
+        return {
+            "Shape": "rect",
+            "w": 1,
+            "h": 1,
+            "Color": "dimgray",
+            "Filled": "true",
+            "Layer": 0,
+        }
+
     if hasattr(agent, "resource_type"):
         color_map = {
             ResourceType.CRYSTAL: "dodgerblue",
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import pytest
+
+from mesa_simulation.batch import expand_runs, load_config, run_one
+from mesa_simulation.sharding import run_sharded
+
+SWEEP = Path(__file__).resolve().parent.parent / "examples" / "sweep.json"
+
+
+def _runs() -> list:
+    """As duas primeiras seeds de cada variante, só com os 4 primeiros recursos."""
+    out = []
+    for run in expand_runs(load_config(SWEEP)):
+        if run["seed"] < 2:
+            params = dict(run["params"])
+            params["resources"] = params["resources"][:4]
+            out.append(
+                pytest.param(
+                    {**run, "params": params}, id=f"{run['variant']}-{run['seed']}"
+                )
+            )
+    return out
+
+
+@pytest.mark.parametrize("run", _runs())
+def test_2x2_collects_the_same_as_single_process(run):
+    single = run_one(run)
+    sharded = run_sharded(run["params"], 2, 2, run["seed"], run["max_steps"])
+
+    assert single["depleted_at"] is not None
+    assert sharded["depleted_at"] is not None
+    assert sharded["utility"] == single["utility"]